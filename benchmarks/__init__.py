@@ -0,0 +1 @@
+from benchmarks.suite import BENCHMARKS, Benchmark, compare, measure, run_suite
@@ -0,0 +1,82 @@
+from __future__ import annotations
+import argparse
+import sys
+from benchmarks import importtime, parity, water
+from benchmarks.suite import compare, format_comparison, format_results, load, run_suite, save
+
+# python -m benchmarks run [-o out.json] [-k name ...] [--kind micro|macro]
+# python -m benchmarks compare base.json new.json [--threshold 0.10]   (exit 1 on regression)
+# python -m benchmarks parity record golden.json [--no-combustion] [--no-boiler]
+# python -m benchmarks parity check golden.json [-m mode ...]           (exit 1 outside tolerance)
+# python -m benchmarks imports [entry point ...]                         (exit 1 over budget)
+# python -m benchmarks water [-n 2000] [--no-throughput]                  (exit 1 on IF97 parity failure)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="run the suite and store the results as JSON")
+    p_run.add_argument("-o", "--output", help="JSON results file")
+    p_run.add_argument("-k", "--filter", nargs="*", default=None, help="only benchmarks whose name contains one of these")
+    p_run.add_argument("--kind", choices=("micro", "macro"), default=None)
+    p_run.add_argument("--repeat", type=int, default=5, help="samples per micro benchmark")
+    p_run.add_argument("--macro-repeat", type=int, default=3, help="samples per macro benchmark")
+    p_run.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per micro sample")
+
+    p_cmp = sub.add_parser("compare", help="flag regressions between two result files")
+    p_cmp.add_argument("base")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown of the median")
+
+    p_par = sub.add_parser("parity", help="compare fast modes against recorded reference outputs")
+    p_par.add_argument("action", choices=("record", "check"))
+    p_par.add_argument("golden", help="golden outputs file (JSON)")
+    p_par.add_argument("-m", "--mode", nargs="*", default=None,
+                       help=f"modes to check (default: all but reference; known: {', '.join(parity.MODES)})")
+    p_par.add_argument("--no-combustion", action="store_true")
+    p_par.add_argument("--no-boiler", action="store_true")
+
+    p_imp = sub.add_parser("imports", help="check the import-time budget of the entry points")
+    p_imp.add_argument("entry_points", nargs="*", help=f"default: {', '.join(importtime.ENTRY_POINTS)}")
+    p_imp.add_argument("--repeat", type=int, default=3)
+
+    p_wat = sub.add_parser("water", help="IF97 water backend: parity with iapws and throughput")
+    p_wat.add_argument("-n", "--states", type=int, default=2000, help="random (P, h) states for the parity check")
+    p_wat.add_argument("--no-throughput", action="store_true")
+
+    args = parser.parse_args(argv)
+    if args.command == "water":
+        par = water.parity(n=args.states)
+        print(water.format_report(par, None if args.no_throughput else water.throughput()))
+        return 0 if par["ok"] else 1
+    if args.command == "imports":
+        rows = importtime.check(args.entry_points, repeat=args.repeat)
+        print(importtime.format_rows(rows))
+        return 0 if all(r["ok"] for r in rows) else 1
+    if args.command == "parity":
+        if args.action == "record":
+            parity.record_golden(args.golden, combustion=not args.no_combustion, boiler=not args.no_boiler)
+            return 0
+        modes = args.mode or [m for m in parity.MODES if m != "reference"]
+        report = parity.check(args.golden, modes)
+        print(parity.format_report(report))
+        return 0 if parity.passed(report) else 1
+
+    if args.command == "run":
+        report = run_suite(args.filter, kind=args.kind, repeat=args.repeat, min_time=args.min_time,
+                           macro_repeat=args.macro_repeat)
+        print(format_results(report))
+        if args.output:
+            save(report, args.output)
+        return 0
+
+    rows = compare(load(args.base), load(args.new), threshold=args.threshold)
+    print(format_comparison(rows))
+    regressions = [r["name"] for r in rows if r["status"] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
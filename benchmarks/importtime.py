@@ -0,0 +1,71 @@
+from __future__ import annotations
+import ast
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+from benchmarks.suite import ROOT
+
+# Import-time budget per entry point, measured with `python -X importtime`.
+# Only the entry point's import statements run (not its solve), in a fresh
+# interpreter; the interpreter's own start-up imports are subtracted.
+
+@dataclass(frozen=True)
+class Budget:
+    seconds: float
+    forbidden: Tuple[str, ...] = ()     # top-level packages this path must not load
+
+ENTRY_POINTS: Dict[str, Tuple[str, Budget]] = {
+    # name: (script path or module, budget)
+    "main.py": ("main.py", Budget(1.5, forbidden=("CoolProp", "cantera", "iapws"))),
+    "thermo_run.py": ("thermo_run.py", Budget(1.5, forbidden=("cantera", "iapws", "CoolProp"))),
+    "config": ("heat_transfer.config.loader", Budget(1.2, forbidden=("cantera", "iapws", "CoolProp"))),
+}
+
+def _import_code(target: str) -> str:
+    # a script contributes its top-level import statements, a module is imported as is
+    path = ROOT / target
+    if not target.endswith(".py"):
+        return f"import {target}"
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+def _importtime(code: str) -> Tuple[float, List[str]]:
+    # (seconds, top-level packages imported) for code run in a fresh interpreter
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    total, packages = 0, set()
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue                        # header line
+        packages.add(name.strip().split(".")[0])
+        if not name[1:].startswith(" "):    # top level: not imported by another module
+            total += int(cumulative)
+    return total / 1e6, sorted(packages)
+
+def measure(name: str, repeat: int = 3) -> Dict[str, object]:
+    target, budget = ENTRY_POINTS[name]
+    code = _import_code(target)
+    baseline = min(_importtime("pass")[0] for _ in range(repeat))
+    runs = [_importtime(code) for _ in range(repeat)]
+    seconds = min(t for t, _ in runs) - baseline
+    loaded = runs[0][1]
+    bad = [p for p in budget.forbidden if p in loaded]
+    return {"entry_point": name, "seconds": seconds, "budget_s": budget.seconds, "forbidden_loaded": bad,
+            "ok": seconds <= budget.seconds and not bad}
+
+def check(names: Sequence[str] | None = None, repeat: int = 3) -> List[Dict[str, object]]:
+    return [measure(n, repeat=repeat) for n in (names or ENTRY_POINTS)]
+
+def format_rows(rows: Sequence[Dict[str, object]]) -> str:
+    out = [f"{'entry point':<16} {'import [s]':>10} {'budget [s]':>10}  status"]
+    for r in rows:
+        problems = (["over budget"] if r["seconds"] > r["budget_s"] else []) + \
+                   [f"loads {p}" for p in r["forbidden_loaded"]]
+        status = ", ".join(problems) or "ok"
+        out.append(f"{r['entry_point']:<16} {r['seconds']:>10.3f} {r['budget_s']:>10.3f}  {status}")
+    return "\n".join(out)
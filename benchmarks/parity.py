@@ -0,0 +1,274 @@
+from __future__ import annotations
+import hashlib
+import json
+import math
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Sequence
+from benchmarks.suite import SETTINGS, STAGES, STREAMS
+
+# Accuracy-versus-speed check of the fast modes. Reference outputs (T_ad, boiler
+# outlet, profile norms) are recorded once as a golden file; each mode then runs
+# the same cases and is scored on worst-case error per quantity and on speedup.
+
+@dataclass(frozen=True)
+class Tolerances:
+    T_ad: float = 0.5                       # K
+    gas_temperature_out: float = 1.0        # K
+    gas_pressure_out: float = 50.0          # Pa
+    water_enthalpy_out: float = 2000.0      # J/kg
+    gas_temperature_rms: float = 0.01       # relative
+    water_enthalpy_rms: float = 0.01        # relative
+
+RELATIVE = ("gas_temperature_rms", "water_enthalpy_rms")
+COMBUSTION_QUANTITIES = ("T_ad",)
+BOILER_QUANTITIES = ("gas_temperature_out", "gas_pressure_out", "water_enthalpy_out",
+                     "gas_temperature_rms", "water_enthalpy_rms")
+
+######################### Cases #########################
+
+@dataclass(frozen=True)
+class CombustionPoint:
+    name: str
+    fuel_mass_flow: float | None = None     # kg/s
+    air_T: float | None = None              # K
+    excess_air_ratio: float | None = None
+
+    def case(self, settings):
+        from common.units import Q_
+        from heat_transfer.functions.coupling import case_from_settings
+        return case_from_settings(
+            settings,
+            fuel_mass_flow=Q_(self.fuel_mass_flow, "kg/s") if self.fuel_mass_flow is not None else None,
+            air_T=Q_(self.air_T, "K") if self.air_T is not None else None,
+            excess_air_ratio=self.excess_air_ratio,
+        )
+
+def default_combustion_points(settings) -> List[CombustionPoint]:
+    m = settings.fuel_mass_flow.to("kg/s").magnitude
+    T = settings.air_T.to("K").magnitude
+    lam = settings.excess_air_ratio
+    return [
+        CombustionPoint("bundled"),
+        CombustionPoint("fuel-10%", fuel_mass_flow=0.9 * m),
+        CombustionPoint("fuel+10%", fuel_mass_flow=1.1 * m),
+        CombustionPoint("air+25K", air_T=T + 25.0),
+        CombustionPoint("lambda-0.05", excess_air_ratio=lam - 0.05),
+        CombustionPoint("lambda+0.10", excess_air_ratio=lam + 0.10),
+    ]
+
+def default_boiler_scenarios(gas, water) -> list:
+    from common.units import Q_
+    from heat_transfer.functions.scenarios import Scenario
+    T = gas.temperature.to("K").magnitude
+    return [
+        Scenario("bundled"),
+        Scenario("gas_T-50K", gas_temperature=Q_(T - 50.0, "K")),
+        Scenario("gas_T+50K", gas_temperature=Q_(T + 50.0, "K")),
+        Scenario("gas_flow-10%", gas_mass_flow_rate=0.9 * gas.mass_flow_rate),
+        Scenario("water_flow+10%", water_mass_flow_rate=1.1 * water.mass_flow_rate),
+    ]
+
+def _scenario_row(scenario) -> Dict[str, Any]:
+    row = {"name": scenario.name}
+    for column, (name, unit) in scenario.COLUMNS.items():
+        value = getattr(scenario, name)
+        row[column] = value.to(unit).magnitude if value is not None else None
+    return row
+
+######################### Modes #########################
+# A mode builds one callable per run so it can keep state (e.g. a warm-start
+# store) across the cases of that run.
+#   combustion: settings -> (case -> T_ad [K])
+#   boiler:     stages   -> ((gas, water) -> outputs dict, SI)
+
+@dataclass(frozen=True)
+class Mode:
+    name: str
+    combustion: Callable[[Any], Callable[[Any], float]] | None = None
+    boiler: Callable[[Any], Callable[[Any, Any], Dict[str, float]]] | None = None
+
+def _rms(values: Sequence[float]) -> float:
+    return math.sqrt(sum(v * v for v in values) / len(values)) if values else math.nan
+
+def _boiler_outputs(gas, water, gas_hist=None, water_hist=None) -> Dict[str, float]:
+    out = {
+        "gas_temperature_out": gas.temperature.to("K").magnitude,
+        "gas_pressure_out": gas.pressure.to("Pa").magnitude,
+        "water_enthalpy_out": water.enthalpy.to("J/kg").magnitude,
+    }
+    if gas_hist:
+        out["gas_temperature_rms"] = _rms([g.temperature.to("K").magnitude for g in gas_hist])
+        out["water_enthalpy_rms"] = _rms([w.enthalpy.to("J/kg").magnitude for w in water_hist])
+    return out
+
+def _reference_combustion(settings):
+    from thermo.services.combustor import build_combustor
+    combustor = build_combustor(settings)
+    return lambda case: combustor.run(case).T_ad_K.to("K").magnitude
+
+def _march(store_factory=None):
+    def make(stages):
+        from heat_transfer.functions.stages_chain import six_stage_counterflow
+        chain = six_stage_counterflow(stages=stages, store=store_factory() if store_factory else None)
+        def solve(gas, water):
+            gas_hist, water_hist = chain.run(gas=gas, water=water)
+            return _boiler_outputs(gas, water, gas_hist, water_hist)
+        return solve
+    return make
+
+def _warm_store():
+    from heat_transfer.functions.continuation import SolutionStore
+    return SolutionStore()
+
+def _lumped(stages):
+    from heat_transfer.functions.lumped import six_stage_lumped
+    chain = six_stage_lumped(stages=stages)
+    def solve(gas, water):
+        chain.run(gas=gas, water=water)
+        return _boiler_outputs(gas, water)
+    return solve
+
+MODES: Dict[str, Mode] = {}
+
+def register_mode(mode: Mode) -> Mode:
+    MODES[mode.name] = mode
+    return mode
+
+REFERENCE = register_mode(Mode("reference", combustion=_reference_combustion, boiler=_march()))
+register_mode(Mode("warm_start", boiler=_march(_warm_store)))
+register_mode(Mode("lumped", boiler=_lumped))
+
+######################### Runs #########################
+
+def _config_hash(*paths: Path) -> str:
+    h = hashlib.sha256()
+    for p in paths:
+        h.update(Path(p).read_bytes())
+    return h.hexdigest()
+
+def _timed(fn: Callable[[], Dict[str, float]], name: str) -> Dict[str, Any]:
+    t0 = perf_counter()
+    try:
+        out = fn()
+    except Exception as exc:
+        return {"name": name, "error": " ".join(f"{type(exc).__name__}: {exc}".split())}
+    return {"name": name, "time_s": perf_counter() - t0, **out}
+
+def run_mode(mode: Mode, combustion_points: Sequence[CombustionPoint], boiler_scenarios: Sequence,
+             settings_path: str | Path = SETTINGS, stages_path: str | Path = STAGES,
+             streams_path: str | Path = STREAMS) -> Dict[str, List[Dict[str, Any]]]:
+    out: Dict[str, List[Dict[str, Any]]] = {"combustion": [], "boiler": []}
+    if mode.combustion is not None and combustion_points:
+        from thermo.config.schemas import load_settings
+        settings = load_settings(str(settings_path))
+        solve = mode.combustion(settings)
+        for p in combustion_points:
+            case = p.case(settings)
+            out["combustion"].append(_timed(lambda: {"T_ad": solve(case)}, p.name))
+    if mode.boiler is not None and boiler_scenarios:
+        from heat_transfer.config.loader import ConfigLoader
+        stages = ConfigLoader.load_stages(stages_path)
+        gas0 = ConfigLoader.load_gas_stream(streams_path)
+        water0 = ConfigLoader.load_water_stream(streams_path)
+        solve = mode.boiler(stages)
+        for sc in boiler_scenarios:
+            gas, water = sc.apply(gas0, water0)
+            out["boiler"].append(_timed(lambda: solve(gas, water), sc.name))
+    return out
+
+def record_golden(path: str | Path, combustion: bool = True, boiler: bool = True,
+                  settings_path: str | Path = SETTINGS, stages_path: str | Path = STAGES,
+                  streams_path: str | Path = STREAMS) -> Dict[str, Any]:
+    from heat_transfer.config.loader import ConfigLoader
+    from thermo.config.schemas import load_settings
+    points = default_combustion_points(load_settings(str(settings_path))) if combustion else []
+    scenarios = default_boiler_scenarios(ConfigLoader.load_gas_stream(streams_path),
+                                         ConfigLoader.load_water_stream(streams_path)) if boiler else []
+    results = run_mode(REFERENCE, points, scenarios, settings_path, stages_path, streams_path)
+    golden = {
+        "metadata": {"created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                     "config_hash": _config_hash(settings_path, stages_path, streams_path)},
+        "cases": {"combustion": [asdict(p) for p in points], "boiler": [_scenario_row(s) for s in scenarios]},
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(golden, fh, indent=2)
+    return golden
+
+######################### Comparison #########################
+
+def _score(reference: List[Dict[str, Any]], candidate: List[Dict[str, Any]], quantities: Sequence[str],
+           tol: Tolerances) -> Dict[str, Any]:
+    ref = {r["name"]: r for r in reference}
+    t_ref = t_mode = 0.0
+    worst: Dict[str, Dict[str, Any]] = {}
+    failed: List[str] = []
+    for r in candidate:
+        g = ref.get(r["name"])
+        if g is None or "error" in g:
+            continue                    # no golden value to compare against
+        if "error" in r:
+            failed.append(f"{r['name']}: {r['error']}")
+            continue
+        t_ref += g["time_s"]
+        t_mode += r["time_s"]
+        for q in quantities:
+            if q not in r or q not in g:
+                continue
+            err = abs(r[q] - g[q])
+            if q in RELATIVE:
+                err /= abs(g[q])
+            if q not in worst or err > worst[q]["error"]:
+                worst[q] = {"error": err, "case": r["name"], "tolerance": getattr(tol, q),
+                            "ok": err <= getattr(tol, q)}
+    return {
+        "speedup": t_ref / t_mode if t_mode > 0 else None,
+        "worst": worst,
+        "failed": failed,
+        "ok": not failed and all(w["ok"] for w in worst.values()),
+    }
+
+def check(golden_path: str | Path, modes: Sequence[str], tol: Tolerances = Tolerances(),
+          settings_path: str | Path = SETTINGS, stages_path: str | Path = STAGES,
+          streams_path: str | Path = STREAMS) -> Dict[str, Dict[str, Any]]:
+    from heat_transfer.functions.scenarios import Scenario
+    with open(golden_path, encoding="utf-8") as fh:
+        golden = json.load(fh)
+    if golden["metadata"]["config_hash"] != _config_hash(settings_path, stages_path, streams_path):
+        raise ValueError(f"{golden_path} was recorded for a different settings/stages/streams configuration")
+    points = [CombustionPoint(**p) for p in golden["cases"]["combustion"]]
+    scenarios = [Scenario.from_row(row) for row in golden["cases"]["boiler"]]
+    report: Dict[str, Dict[str, Any]] = {}
+    for name in modes:
+        if name not in MODES:
+            raise ValueError(f"Unknown mode: {name} (known: {', '.join(MODES)})")
+        results = run_mode(MODES[name], points, scenarios, settings_path, stages_path, streams_path)
+        report[name] = {}
+        if results["combustion"]:
+            report[name]["combustion"] = _score(golden["results"]["combustion"], results["combustion"],
+                                                COMBUSTION_QUANTITIES, tol)
+        if results["boiler"]:
+            report[name]["boiler"] = _score(golden["results"]["boiler"], results["boiler"], BOILER_QUANTITIES, tol)
+    return report
+
+def format_report(report: Dict[str, Dict[str, Any]]) -> str:
+    out = [f"{'mode':<12} {'domain':<11} {'speedup':>8}  {'quantity':<22} {'worst error':>12} {'tolerance':>10}  {'case':<16} status"]
+    for mode, domains in report.items():
+        for domain, s in domains.items():
+            speedup = f"{s['speedup']:.2f}x" if s["speedup"] else "-"
+            if not s["worst"]:
+                out.append(f"{mode:<12} {domain:<11} {speedup:>8}  {'-':<22} {'-':>12} {'-':>10}  {'-':<16} "
+                           f"{'ok' if s['ok'] else 'FAIL'}")
+            for q, w in s["worst"].items():
+                unit = "rel" if q in RELATIVE else ""
+                out.append(f"{mode:<12} {domain:<11} {speedup:>8}  {q:<22} {w['error']:>12.4g} "
+                           f"{w['tolerance']:>6.4g} {unit:<3}  {w['case']:<16} {'ok' if w['ok'] else 'FAIL'}")
+            for f in s["failed"]:
+                out.append(f"{mode:<12} {domain:<11} {'':>8}  failed {f}")
+    return "\n".join(out)
+
+def passed(report: Dict[str, Dict[str, Any]]) -> bool:
+    return all(s["ok"] for domains in report.values() for s in domains.values())
@@ -0,0 +1,336 @@
+from __future__ import annotations
+import copy
+import json
+import os
+import platform
+import statistics
+import subprocess
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+SETTINGS = ROOT / "thermo" / "config" / "settings.toml"
+STAGES = ROOT / "heat_transfer" / "config" / "stages.yaml"
+STREAMS = ROOT / "heat_transfer" / "config" / "streams.yaml"
+
+PACKAGES = ("pint", "numpy", "scipy", "cantera", "CoolProp", "iapws", "PyYAML")
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    kind: str                                   # "micro" | "macro"
+    setup: Callable[[], Callable[[], Any]]      # untimed; returns the timed call
+
+######################### Fixtures #########################
+# Built once per process and shared by the benchmarks that need them; setup time
+# is never part of a measurement.
+
+@lru_cache(maxsize=None)
+def _settings():
+    from thermo.config.schemas import load_settings
+    return load_settings(str(SETTINGS))
+
+@lru_cache(maxsize=None)
+def _combustor():
+    from thermo.services.combustor import build_combustor
+    return build_combustor(_settings())
+
+@lru_cache(maxsize=None)
+def _flue():
+    # flue mass fractions and pressure of the bundled combustion case
+    from heat_transfer.functions.coupling import case_from_settings
+    from thermo.core.composition import Composition
+    s = _settings()
+    res = _combustor().run(case_from_settings(s))
+    flue_x = {k: float(getattr(v, "magnitude", v)) for k, v in res.flue_x.items()}
+    return Composition(flue_x, "mole").to_mass(s.species_molar_masses).fractions, s.air_P, res.T_ad_K
+
+def _streams(stage: str = "HX_1"):
+    from heat_transfer.config.loader import ConfigLoader
+    stages = ConfigLoader.load_stages(STAGES)
+    gas = ConfigLoader.load_gas_stream(STREAMS)
+    water = ConfigLoader.load_water_stream(STREAMS)
+    gas.stage = water.stage = getattr(stages, stage)
+    T_mid = 0.5 * (gas.temperature + water.temperature)
+    gas.wall_temperature = T_mid
+    water.wall_temperature = T_mid
+    return gas, water
+
+def _drifting(obj, attr: str, step) -> Callable[[], None]:
+    # the property backends memoize on state; nudging the state on every call
+    # measures fresh evaluations, as in the march
+    def advance():
+        setattr(obj, attr, getattr(obj, attr) + step)
+    return advance
+
+######################### Micro #########################
+
+def _cp_mass_mixture():
+    from common.units import Q_
+    w, P, T_ad = _flue()
+    cp = _combustor().cp
+    T = [T_ad.to("K").magnitude]
+    def call():
+        T[0] += 1e-3
+        return cp.cp_mass_mixture(Q_(T[0], "K"), P, w)
+    return call
+
+def _integrate_cp_mass():
+    from common.units import Q_
+    w, P, T_ad = _flue()
+    cp, T_ref = _combustor().cp, _settings().T_ref
+    T = [T_ad.to("K").magnitude]
+    def call():
+        T[0] += 1e-3
+        return cp.integrate_cp_mass(P, w, T_ref, Q_(T[0], "K"))
+    return call
+
+def _gas_prop(name: str):
+    def setup():
+        from common.units import Q_
+        from heat_transfer.functions.fluid_props import GasProps
+        gas, _ = _streams()
+        fn = getattr(GasProps, name)
+        advance = _drifting(gas, "temperature", Q_(1e-3, "K"))
+        def call():
+            advance()
+            return fn(gas)
+        return call
+    return setup
+
+def _water_prop(name: str):
+    def setup():
+        from common.units import Q_
+        from heat_transfer.functions.fluid_props import WaterProps
+        _, water = _streams()
+        fn = getattr(WaterProps, name)
+        # saturation states are memoized on pressure alone
+        if name in SATURATION_PROPS:
+            advance = _drifting(water, "pressure", Q_(1e-3, "Pa"))
+        else:
+            advance = _drifting(water, "enthalpy", Q_(1e-3, "J/kg"))
+        def call():
+            advance()
+            return fn(water)
+        return call
+    return setup
+
+def _calc_htc():
+    from common.units import Q_
+    from heat_transfer.functions.htc_water import WaterHTC
+    _, water = _streams()
+    water.q_flux = Q_(50e3, "W/m^2")
+    advance = _drifting(water, "enthalpy", Q_(1e-3, "J/kg"))
+    def call():
+        advance()
+        return WaterHTC.calc_htc(water)
+    return call
+
+def _heat_rate():
+    from common.units import Q_
+    from heat_transfer.config.compiled import CompiledStage
+    from heat_transfer.functions.heat_rate import HeatRate
+    gas, water = _streams()
+    geom = CompiledStage.from_stage(gas.stage)
+    advance = _drifting(gas, "temperature", Q_(1e-3, "K"))
+    def call():
+        advance()
+        return HeatRate(gas.stage, gas, water, geom=geom).heat_rate_per_length()
+    return call
+
+def _iterate_wall():
+    from heat_transfer.config.compiled import CompiledStage
+    from heat_transfer.functions.stage_solver import StageSolver
+    gas, water = _streams()
+    geom = CompiledStage.from_stage(gas.stage)
+    def call():
+        # cold start from the same inlet each time
+        return StageSolver(gas.stage, copy.deepcopy(gas), copy.deepcopy(water), geom=geom).iterate_wall_temperature()
+    return call
+
+def _water_batch(backend: str, n: int = 1000):
+    # n random drum/economiser states per call
+    def setup():
+        from benchmarks.water import states
+        P, h = states(n)
+        if backend == "if97":
+            from heat_transfer.functions.if97 import props_ph
+            return lambda: props_ph(P, h)
+        from iapws import IAPWS97
+        return lambda: [IAPWS97(P=p, h=e) for p, e in zip(P, h)]
+    return setup
+
+######################### Macro #########################
+
+def _combustor_run():
+    from heat_transfer.functions.coupling import case_from_settings
+    combustor, case = _combustor(), case_from_settings(_settings())
+    return lambda: combustor.run(case)
+
+def _flame_sensitivities():
+    from heat_transfer.functions.coupling import case_from_settings
+    from thermo.services import sensitivity
+    combustor, case = _combustor(), case_from_settings(_settings())
+    result = combustor.run(case)
+    return lambda: sensitivity.flame_temperature(combustor, case, result=result)
+
+def _runner_run():
+    from heat_transfer.functions.runner import run
+    return lambda: run(str(STAGES), str(STREAMS))
+
+GAS_PROPS = ("thermal_conductivity", "viscosity", "density", "enthalpy", "specific_heat")
+WATER_PROPS = ("saturation_temperature", "saturation_enthalpy_liquid", "latent_heat", "surface_tension",
+               "temperature", "density", "dynamic_viscosity", "thermal_conductivity", "specific_heat_cp",
+               "quality_from_h")
+SATURATION_PROPS = ("saturation_temperature", "saturation_enthalpy_liquid", "latent_heat", "surface_tension",
+                    "quality_from_h")
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark("MixtureCp.cp_mass_mixture", "micro", _cp_mass_mixture),
+    Benchmark("MixtureCp.integrate_cp_mass", "micro", _integrate_cp_mass),
+    *(Benchmark(f"GasProps.{p}", "micro", _gas_prop(p)) for p in GAS_PROPS),
+    *(Benchmark(f"WaterProps.{p}", "micro", _water_prop(p)) for p in WATER_PROPS),
+    Benchmark("WaterHTC.calc_htc", "micro", _calc_htc),
+    Benchmark("water_states[1000].iapws", "micro", _water_batch("iapws")),
+    Benchmark("water_states[1000].if97", "micro", _water_batch("if97")),
+    Benchmark("HeatRate.heat_rate_per_length", "micro", _heat_rate),
+    Benchmark("StageSolver.iterate_wall_temperature", "micro", _iterate_wall),
+    Benchmark("Combustor.run", "macro", _combustor_run),
+    Benchmark("sensitivity.flame_temperature", "macro", _flame_sensitivities),
+    Benchmark("runner.run", "macro", _runner_run),
+]
+
+######################### Timing #########################
+
+def _autorange(call: Callable[[], Any], min_time: float) -> int:
+    # calls per sample so one sample lasts at least min_time (as timeit does)
+    number = 1
+    while True:
+        t0 = perf_counter()
+        for _ in range(number):
+            call()
+        if perf_counter() - t0 >= min_time or number >= 1 << 20:
+            return number
+        number *= 2
+
+def measure(bench: Benchmark, repeat: int = 5, min_time: float = 0.2) -> Dict[str, Any]:
+    row: Dict[str, Any] = {"name": bench.name, "kind": bench.kind}
+    try:
+        call = bench.setup()
+        call()                                  # warm-up: imports, lazy caches
+        number = 1 if bench.kind == "macro" else _autorange(call, min_time)
+        samples = []
+        for _ in range(repeat):
+            t0 = perf_counter()
+            for _ in range(number):
+                call()
+            samples.append((perf_counter() - t0) / number)
+    except Exception as exc:
+        row["error"] = " ".join(f"{type(exc).__name__}: {exc}".split())
+        return row
+    row.update(number=number, repeat=repeat, samples_s=samples, min_s=min(samples),
+               median_s=statistics.median(samples), mean_s=statistics.fmean(samples),
+               stdev_s=statistics.stdev(samples) if len(samples) > 1 else 0.0)
+    return row
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as fh:
+            for line in fh:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+def machine_metadata() -> Dict[str, Any]:
+    versions = {}
+    for pkg in PACKAGES:
+        try:
+            versions[pkg] = metadata.version(pkg)
+        except metadata.PackageNotFoundError:
+            versions[pkg] = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "cpu": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": _git_commit(),
+        "packages": versions,
+    }
+
+def run_suite(names: Sequence[str] | None = None, kind: str | None = None, repeat: int = 5,
+              min_time: float = 0.2, macro_repeat: int = 3) -> Dict[str, Any]:
+    selected = [b for b in BENCHMARKS
+                if (kind is None or b.kind == kind) and (not names or any(n in b.name for n in names))]
+    results = [measure(b, repeat=macro_repeat if b.kind == "macro" else repeat, min_time=min_time)
+               for b in selected]
+    return {"metadata": machine_metadata(), "results": results}
+
+######################### Comparison #########################
+
+def load(path: str | Path) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+def save(report: Dict[str, Any], path: str | Path) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    # median time ratio new/base per benchmark; above 1 + threshold is a regression
+    old = {r["name"]: r for r in base["results"]}
+    rows = []
+    for r in new["results"]:
+        b = old.get(r["name"])
+        row = {"name": r["name"], "base_s": None, "new_s": None, "ratio": None, "status": "new"}
+        if b is not None:
+            row["base_s"], row["new_s"] = b.get("median_s"), r.get("median_s")
+            if row["base_s"] is None or row["new_s"] is None:
+                row["status"] = "error"
+            else:
+                row["ratio"] = row["new_s"] / row["base_s"]
+                row["status"] = ("regression" if row["ratio"] > 1.0 + threshold else
+                                 "improvement" if row["ratio"] < 1.0 / (1.0 + threshold) else "same")
+        rows.append(row)
+    return rows
+
+def _fmt_time(t: float | None) -> str:
+    if t is None:
+        return "-"
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if t >= scale:
+            return f"{t / scale:.3f} {unit}"
+    return f"{t / 1e-9:.1f} ns"
+
+def format_results(report: Dict[str, Any]) -> str:
+    out = [f"{'benchmark':<42} {'kind':<6} {'median':>12} {'min':>12} {'stdev':>12} {'calls':>8}"]
+    for r in report["results"]:
+        if "error" in r:
+            out.append(f"{r['name']:<42} {r['kind']:<6} failed: {r['error']}")
+        else:
+            out.append(f"{r['name']:<42} {r['kind']:<6} {_fmt_time(r['median_s']):>12} {_fmt_time(r['min_s']):>12} "
+                       f"{_fmt_time(r['stdev_s']):>12} {r['number'] * r['repeat']:>8}")
+    return "\n".join(out)
+
+def format_comparison(rows: Sequence[Dict[str, Any]]) -> str:
+    out = [f"{'benchmark':<42} {'base':>12} {'new':>12} {'ratio':>7}  status"]
+    for r in rows:
+        ratio = f"{r['ratio']:.3f}" if r["ratio"] is not None else "-"
+        out.append(f"{r['name']:<42} {_fmt_time(r['base_s']):>12} {_fmt_time(r['new_s']):>12} {ratio:>7}  {r['status']}")
+    return "\n".join(out)
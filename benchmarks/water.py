@@ -0,0 +1,59 @@
+from __future__ import annotations
+from time import perf_counter
+from typing import Dict, List, Sequence
+import numpy as np
+
+# Parity and throughput of the NumPy IF97 water backend against iapws.IAPWS97.
+# States are drawn over the drum and economiser range (regions 1, 2 and 4).
+
+PROPS = ("T", "rho", "cp", "mu", "k", "x")
+P_RANGE = (0.05, 16.0)          # MPa
+H_RANGE = (50.0, 3600.0)        # kJ/kg
+
+def states(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(*P_RANGE, n), rng.uniform(*H_RANGE, n)
+
+def parity(n: int = 2000, seed: int = 0, rtol: float = 1e-9) -> Dict[str, object]:
+    # worst relative error per property; two-phase cp, mu, k must be unset (NaN) in both
+    from iapws import IAPWS97
+    from heat_transfer.functions import if97
+    P, h = states(n, seed)
+    fast = if97.props_ph(P, h, PROPS)
+    worst = {p: 0.0 for p in PROPS}
+    mismatched: List[str] = []
+    for i in range(n):
+        ref = IAPWS97(P=P[i], h=h[i])
+        for p in PROPS:
+            a, b = getattr(ref, p), float(fast[p][i])
+            if a is None:
+                if not np.isnan(b):
+                    mismatched.append(f"{p} at P={P[i]:.4g} MPa, h={h[i]:.1f} kJ/kg")
+                continue
+            worst[p] = max(worst[p], abs(b - a) / max(abs(a), 1e-12))
+    return {"states": n, "worst": worst, "rtol": rtol, "mismatched": mismatched,
+            "ok": not mismatched and all(e <= rtol for e in worst.values())}
+
+def throughput(n: int = 100_000, reference: int = 500, seed: int = 1) -> Dict[str, float]:
+    # microseconds per state: one vectorized call vs. one IAPWS97 object per state
+    from iapws import IAPWS97
+    from heat_transfer.functions import if97
+    P, h = states(n, seed)
+    t0 = perf_counter()
+    if97.props_ph(P, h, ("T", "rho", "cp", "mu", "k"))
+    fast = (perf_counter() - t0) / n * 1e6
+    t0 = perf_counter()
+    for i in range(reference):
+        IAPWS97(P=P[i], h=h[i])
+    slow = (perf_counter() - t0) / reference * 1e6
+    return {"if97_us": fast, "iapws_us": slow, "speedup": slow / fast}
+
+def format_report(par: Dict[str, object], thr: Dict[str, float] | None = None) -> str:
+    out = [f"parity over {par['states']} states (rtol {par['rtol']:.0e}):"]
+    out += [f"  {p:<4} {e:.2e}" for p, e in par["worst"].items()]
+    out += [f"  mismatch: {m}" for m in par["mismatched"][:10]]
+    if thr is not None:
+        out.append(f"throughput: if97 {thr['if97_us']:.2f} us/state, iapws {thr['iapws_us']:.1f} us/state "
+                   f"({thr['speedup']:.0f}x)")
+    out.append("ok" if par["ok"] else "FAILED")
+    return "\n".join(out)
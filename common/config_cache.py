@@ -0,0 +1,104 @@
+from __future__ import annotations
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+# Built configuration objects (Stages, streams, Settings) cached by a hash of the
+# source file contents plus the source of the modules that build them. An edited
+# config or builder gives a new key, so stale entries are never read.
+#   memory: per process; frozen results (Stages, Settings) are shared, mutable
+#           ones (streams, advanced in place by the solvers) are unpickled fresh
+#           from a stored blob on every load
+#   disk:   <cache dir>/<key>.pickle, shared across runs
+#   BOILER_CONFIG_CACHE=<dir>  cache location (default: $XDG_CACHE_HOME/boiler or ~/.cache/boiler)
+#   BOILER_CONFIG_CACHE=0      memory only
+
+ENV_VAR = "BOILER_CONFIG_CACHE"
+
+_files: Dict[Path, Tuple[int, int, bytes, str]] = {}     # path -> (mtime_ns, size, data, sha256)
+_blobs: Dict[str, bytes] = {}
+_shared: Dict[str, Any] = {}
+stats = {"memory": 0, "disk": 0, "built": 0}
+
+def cache_dir() -> Path | None:
+    env = os.environ.get(ENV_VAR)
+    if env in ("0", ""):
+        return None
+    if env:
+        return Path(env)
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "boiler"
+
+def read_file(path: str | Path) -> Tuple[bytes, str]:
+    # (contents, sha256); read from disk once per process unless the file changes
+    path = Path(path).resolve()
+    st = path.stat()
+    hit = _files.get(path)
+    if hit is not None and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+        return hit[2], hit[3]
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    _files[path] = (st.st_mtime_ns, st.st_size, data, digest)
+    return data, digest
+
+def _key(kind: str, digest: str, builders: Iterable[str]) -> str:
+    h = hashlib.sha256(f"{kind}\0{digest}\0{sys.version_info[:2]}".encode())
+    for module in builders:
+        h.update(read_file(sys.modules[module].__file__)[1].encode())
+    return h.hexdigest()
+
+def atomic_write(path: Path, blob: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(blob)
+        os.replace(tmp, path)           # readers never see a partial file
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def load_cached(kind: str, path: str | Path, build: Callable[[bytes], Any], builders: Iterable[str] = (),
+                frozen: bool = False) -> Any:
+    # build(contents) runs only when neither memory nor disk holds the key;
+    # builders names the modules whose source is part of the key
+    data, digest = read_file(path)
+    key = _key(kind, digest, builders)
+    if key in _shared:
+        stats["memory"] += 1
+        return _shared[key]
+    obj = _load(key, data, build)
+    if frozen:
+        _shared[key] = obj
+    return obj
+
+def _load(key: str, data: bytes, build: Callable[[bytes], Any]) -> Any:
+    blob = _blobs.get(key)
+    if blob is not None:
+        stats["memory"] += 1
+        return pickle.loads(blob)
+    folder = cache_dir()
+    target = folder / f"{key}.pickle" if folder is not None else None
+    if target is not None and target.is_file():
+        try:
+            blob = target.read_bytes()
+            obj = pickle.loads(blob)
+        except Exception:               # truncated or unreadable entry: rebuild below
+            blob = None
+        else:
+            _blobs[key] = blob
+            stats["disk"] += 1
+            return obj
+    obj = build(data)
+    blob = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    _blobs[key] = blob
+    stats["built"] += 1
+    if target is not None:
+        try:
+            atomic_write(target, blob)
+        except OSError:
+            pass                        # read-only or full cache dir: memory cache still applies
+    return obj
@@ -0,0 +1,122 @@
+from __future__ import annotations
+import json
+import os
+import sys
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Opt-in call counters/timers for the property backends.
+#   BOILER_PROFILE=1           -> table on stderr at the end of runner.run / Combustor.run
+#   BOILER_PROFILE=out.json    -> same summary written as JSON
+#   with profiling() as prof:  -> enable for a block, read prof.table() / prof.to_json()
+# Disabled, each instrumented call costs one attribute check.
+
+ENV_VAR = "BOILER_PROFILE"
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.dump = False               # report() prints/writes only when set
+        self.json_path: str | None = None
+        self.stats: Dict[Tuple[str, str, str], List[float]] = {}   # (stage, phase, name) -> [calls, seconds]
+        self.stage = "-"
+        self.phase = "-"
+
+    def reset(self) -> None:
+        self.stats.clear()
+        self.stage = "-"
+        self.phase = "-"
+
+    def record(self, name: str, dt: float) -> None:
+        key = (self.stage, self.phase, name)
+        s = self.stats.get(key)
+        if s is None:
+            self.stats[key] = [1, dt]
+        else:
+            s[0] += 1
+            s[1] += dt
+
+    def rows(self) -> List[Dict[str, Any]]:
+        rows = [{"stage": st, "phase": ph, "name": n, "calls": int(c), "total_s": t, "mean_us": 1e6 * t / c}
+                for (st, ph, n), (c, t) in self.stats.items()]
+        return sorted(rows, key=lambda r: (r["stage"], r["phase"], -r["total_s"]))
+
+    def table(self) -> str:
+        out = [f"{'stage':<10} {'phase':<16} {'name':<38} {'calls':>9} {'total [s]':>10} {'mean [us]':>10}"]
+        for r in self.rows():
+            out.append(f"{r['stage']:<10} {r['phase']:<16} {r['name']:<38} {r['calls']:>9d} "
+                       f"{r['total_s']:>10.3f} {r['mean_us']:>10.1f}")
+        return "\n".join(out)
+
+    def to_json(self) -> str:
+        return json.dumps(self.rows(), indent=2)
+
+PROFILER = Profiler()
+
+_env = os.environ.get(ENV_VAR, "")
+if _env not in ("", "0"):
+    PROFILER.enabled = True
+    PROFILER.dump = True
+    PROFILER.json_path = _env if _env.endswith(".json") else None
+
+def instrumented(name: str):
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return fn(*args, **kwargs)
+            t0 = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                PROFILER.record(name, perf_counter() - t0)
+        return wrapper
+    return deco
+
+class scope:
+    # Tags instrumented calls with the current stage and/or solver phase; a phase
+    # block also records its own inclusive time as "[phase]".
+    __slots__ = ("stage", "phase", "_saved", "_t0")
+
+    def __init__(self, stage: str | None = None, phase: str | None = None):
+        self.stage = stage
+        self.phase = phase
+        self._saved = None
+
+    def __enter__(self) -> "scope":
+        if PROFILER.enabled:
+            self._saved = (PROFILER.stage, PROFILER.phase)
+            if self.stage is not None:
+                PROFILER.stage = self.stage
+            if self.phase is not None:
+                PROFILER.phase = self.phase
+            self._t0 = perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._saved is not None:
+            if self.phase is not None:
+                PROFILER.record(f"[{self.phase}]", perf_counter() - self._t0)
+            PROFILER.stage, PROFILER.phase = self._saved
+            self._saved = None
+
+@contextmanager
+def profiling(dump: bool = False, json_path: str | None = None) -> Iterator[Profiler]:
+    saved = (PROFILER.enabled, PROFILER.dump, PROFILER.json_path)
+    PROFILER.reset()
+    PROFILER.enabled, PROFILER.dump, PROFILER.json_path = True, dump, json_path
+    try:
+        yield PROFILER
+    finally:
+        PROFILER.enabled, PROFILER.dump, PROFILER.json_path = saved
+
+def report(title: str) -> None:
+    if not (PROFILER.enabled and PROFILER.dump):
+        return
+    if PROFILER.json_path:
+        with open(PROFILER.json_path, "w", encoding="utf-8") as fh:
+            fh.write(PROFILER.to_json())
+    else:
+        print(f"=== Property profile: {title} ===\n{PROFILER.table()}", file=sys.stderr)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+import dataclasses
+import hashlib
+import json
+import os
+import pickle
+import sys
+from functools import lru_cache
+from types import CodeType
+from pathlib import Path
+from typing import Any, Dict, Tuple
+from common.config_cache import atomic_write, read_file
+
+# Opt-in on-disk cache of solver results, keyed by a canonical hash of every
+# input and of the solver source. One pickle per entry; the file mtime is the
+# LRU clock, and the oldest entries are evicted once the folder exceeds max_bytes.
+# Writes are atomic (temp file + rename), so concurrent processes can share a folder.
+#   BOILER_RESULT_CACHE=<dir>       enable for Combustor.run and runner.run
+#   BOILER_RESULT_CACHE_MB=<int>    size bound (default 512)
+
+ENV_VAR = "BOILER_RESULT_CACHE"
+SIZE_ENV_VAR = "BOILER_RESULT_CACHE_MB"
+
+def canonical(obj: Any) -> Any:
+    # JSON-able form with the same value for equal inputs; quantities in SI base units
+    if hasattr(obj, "to_base_units") and hasattr(obj, "magnitude"):
+        q = obj.to_base_units()
+        return ["Q", canonical(q.magnitude), str(q.units)]
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return [type(obj).__name__, {f.name: canonical(getattr(obj, f.name)) for f in dataclasses.fields(obj)}]
+    if isinstance(obj, dict):
+        return {str(k): canonical(v) for k, v in sorted(obj.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(obj, (list, tuple)):
+        return [canonical(v) for v in obj]
+    if isinstance(obj, float):
+        return repr(obj)                # exact, and no float formatting differences
+    if obj is None or isinstance(obj, (bool, int, str)):
+        return obj
+    if hasattr(obj, "tolist"):          # numpy scalars / arrays
+        return canonical(obj.tolist())
+    if callable(obj):
+        name = f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', type(obj).__name__)}"
+        code = getattr(obj, "__code__", None)
+        if code is None:                # builtins, classes
+            return name
+        # the name alone is not enough: a script's lambdas are all __main__.<lambda>,
+        # and code_digest does not cover __main__
+        cells = [c.cell_contents for c in getattr(obj, "__closure__", None) or ()]
+        return [name, _code_key(code), canonical(getattr(obj, "__defaults__", None)), canonical(cells)]
+    raise TypeError(f"Cannot build a cache key from {type(obj).__name__}")
+
+def _code_key(code: CodeType) -> str:
+    # bytecode, names and constants (nested functions included); line numbers do not count
+    h = hashlib.sha256(code.co_code)
+    h.update(repr((code.co_names, code.co_varnames, code.co_freevars)).encode())
+    for c in code.co_consts:
+        if isinstance(c, CodeType):
+            h.update(_code_key(c).encode())
+        elif isinstance(c, frozenset):
+            h.update(repr(sorted(map(repr, c))).encode())
+        else:
+            h.update(repr(c).encode())
+    return h.hexdigest()
+
+@lru_cache(maxsize=None)
+def code_digest(*packages: str) -> str:
+    # source of every loaded module under the given packages; a solver change is a new key
+    h = hashlib.sha256()
+    for name in sorted(sys.modules):
+        module = sys.modules[name]
+        file = getattr(module, "__file__", None)
+        if file and file.endswith(".py") and name.split(".")[0] in packages:
+            h.update(name.encode())
+            h.update(read_file(file)[1].encode())
+    return h.hexdigest()
+
+class ResultCache:
+    def __init__(self, folder: str | Path, max_bytes: int = 512 * 2**20):
+        self.folder = Path(folder)
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def key(self, namespace: str, *inputs: Any, code: Tuple[str, ...] = ()) -> str:
+        payload = json.dumps([namespace, code_digest(*code), canonical(inputs)], sort_keys=True,
+                             separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.folder / key[:2] / f"{key}.pickle"
+
+    def get(self, key: str) -> Any | None:
+        path = self._path(key)
+        try:
+            blob = path.read_bytes()
+            value = pickle.loads(blob)
+        except FileNotFoundError:
+            self.stats["misses"] += 1
+            return None
+        except Exception:               # torn or incompatible entry: drop it
+            path.unlink(missing_ok=True)
+            self.stats["misses"] += 1
+            return None
+        try:
+            os.utime(path)              # LRU: a hit makes the entry young again
+        except OSError:
+            pass
+        self.stats["hits"] += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        try:
+            atomic_write(self._path(key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except OSError:
+            return                      # read-only or full disk: the result is still returned
+        self.stats["writes"] += 1
+        self.evict()
+
+    def entries(self) -> list[Tuple[float, int, Path]]:
+        out = []
+        for path in self.folder.glob("*/*.pickle"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:   # evicted by another process
+                continue
+            out.append((st.st_mtime, st.st_size, path))
+        return out
+
+    def evict(self) -> None:
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            path.unlink(missing_ok=True)
+            self.stats["evictions"] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def info(self) -> Dict[str, Any]:
+        entries = self.entries()
+        return {**self.stats, "entries": len(entries), "bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes, "folder": str(self.folder)}
+
+@lru_cache(maxsize=None)
+def _env_cache(folder: str, megabytes: int) -> ResultCache:
+    return ResultCache(folder, max_bytes=megabytes * 2**20)
+
+def default_cache() -> ResultCache | None:
+    # the cache named by BOILER_RESULT_CACHE, one instance per process (shared stats)
+    folder = os.environ.get(ENV_VAR, "")
+    if folder in ("", "0"):
+        return None
+    return _env_cache(folder, int(os.environ.get(SIZE_ENV_VAR, "512")))
@@ -0,0 +1,16 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict
+
+# Result of a sensitivity pass, shared by the combustion (thermo.services.sensitivity)
+# and boiler (heat_transfer.functions.sensitivity) derivatives.
+
+@dataclass(frozen=True)
+class Sensitivities:
+    point: Dict[str, float]                     # parameter values at the solution
+    outputs: Dict[str, float]                   # primal outputs
+    jacobian: Dict[str, Dict[str, float]]       # jacobian[output][parameter]
+
+    def __getitem__(self, key):
+        output, parameter = key
+        return self.jacobian[output][parameter]
@@ -0,0 +1,103 @@
+from __future__ import annotations
+import json
+import os
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Dict, Iterator, List
+
+# Opt-in convergence trace of the solvers: march steps (accepted / cut), wall
+# iterations with their residuals, root-solver evaluations.
+#   BOILER_TRACE=trace.json    -> Chrome trace-event file (chrome://tracing, Perfetto)
+#   BOILER_TRACE=trace.jsonl   -> one event per line
+#   with tracing("t.json"):    -> enable for a block, written on exit
+# Spans are complete events ("ph": "X", ts/dur in us); point records are instant events.
+
+ENV_VAR = "BOILER_TRACE"
+
+def _plain(v: Any) -> Any:
+    # pint quantities -> SI float, everything else must already be JSON-friendly
+    if hasattr(v, "to_base_units"):
+        return float(v.to_base_units().magnitude)
+    return v
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.path: str | None = None
+        self.events: List[Dict[str, Any]] = []
+        self._t0 = perf_counter()
+        self._pid = os.getpid()
+
+    def reset(self) -> None:
+        self.events.clear()
+        self._t0 = perf_counter()
+
+    def now(self) -> float:
+        return 1e6 * (perf_counter() - self._t0)
+
+    def complete(self, name: str, cat: str, ts: float, dur: float, args: Dict[str, Any]) -> None:
+        self.events.append({"name": name, "cat": cat, "ph": "X", "ts": ts, "dur": dur,
+                            "pid": self._pid, "tid": 0, "args": {k: _plain(v) for k, v in args.items()}})
+
+    def instant(self, name: str, cat: str, **args: Any) -> None:
+        if not self.enabled:
+            return
+        self.events.append({"name": name, "cat": cat, "ph": "i", "s": "t", "ts": self.now(),
+                            "pid": self._pid, "tid": 0, "args": {k: _plain(v) for k, v in args.items()}})
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            if path.endswith(".jsonl"):
+                for ev in self.events:
+                    fh.write(json.dumps(ev) + "\n")
+            else:
+                json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, fh)
+
+TRACER = Tracer()
+
+_env = os.environ.get(ENV_VAR, "")
+if _env not in ("", "0"):
+    TRACER.enabled = True
+    TRACER.path = _env
+
+class span:
+    # Complete event around a block; args can be added before exit with set().
+    __slots__ = ("name", "cat", "args", "_ts")
+
+    def __init__(self, name: str, cat: str = "solver", **args: Any):
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self._ts = None
+
+    def set(self, **args: Any) -> None:
+        self.args.update(args)
+
+    def __enter__(self) -> "span":
+        if TRACER.enabled:
+            self._ts = TRACER.now()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._ts is not None:
+            if exc_type is not None:
+                self.args["error"] = exc_type.__name__
+            TRACER.complete(self.name, self.cat, self._ts, TRACER.now() - self._ts, self.args)
+            self._ts = None
+
+@contextmanager
+def tracing(path: str | None = None) -> Iterator[Tracer]:
+    saved = (TRACER.enabled, TRACER.path)
+    TRACER.reset()
+    TRACER.enabled, TRACER.path = True, path
+    try:
+        yield TRACER
+    finally:
+        if path:
+            TRACER.write(path)
+        TRACER.enabled, TRACER.path = saved
+
+def flush() -> None:
+    # end-of-run hook for the BOILER_TRACE environment variable
+    if TRACER.enabled and TRACER.path:
+        TRACER.write(TRACER.path)
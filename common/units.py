@@ -1,9 +1,32 @@
 from __future__ import annotations  # at top of every module
+import os
+from functools import lru_cache
 import pint
 
-ureg = pint.UnitRegistry()
+# The registry is built from pint's parsed definitions cached on disk (pint's
+# cache_folder), not re-parsed from the text files on every start.
+#   BOILER_PINT_CACHE=<dir>  cache location (default: pint's per-user cache dir)
+#   BOILER_PINT_CACHE=0      no disk cache
+PINT_CACHE_ENV = "BOILER_PINT_CACHE"
+
+def _registry() -> pint.UnitRegistry:
+    folder = os.environ.get(PINT_CACHE_ENV, ":auto:")
+    if folder in ("", "0"):
+        return pint.UnitRegistry()
+    try:
+        return pint.UnitRegistry(cache_folder=folder)
+    except OSError:                     # read-only home, full disk, ...
+        return pint.UnitRegistry()
+
+ureg = _registry()
+pint.set_application_registry(ureg)  # quantities unpickled in pool workers land in this registry
 Q_ = ureg.Quantity
 
+@lru_cache(maxsize=None)
+def unit(expr: str) -> pint.Unit:
+    # unit strings from config files and formatters, parsed once per process
+    return ureg.Unit(expr)
+
 class Converter:
 
     @staticmethod
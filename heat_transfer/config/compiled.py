@@ -0,0 +1,85 @@
+from __future__ import annotations
+from math import log, pi
+from typing import Any, Dict, Tuple
+from heat_transfer.config.models import FirePass, SmokePass, Reversal, Economiser, Stages
+
+# Stage geometry reduced to plain SI floats once per stage. The model properties
+# (flow_area, perimeters, ...) rebuild pint expressions on every access; the
+# solvers read these records instead.
+
+def _from_dict(values: Dict[str, Any]) -> "CompiledStage":
+    return CompiledStage(**values)
+
+class CompiledStage:
+    __slots__ = (
+        "stage",                    # source FirePass | SmokePass | Reversal | Economiser
+        "zone",
+        # hot side [m, m^2, -]
+        "inner_length", "inner_diameter", "outer_diameter", "tubes_number",
+        "flow_area", "inner_perimeter", "outer_perimeter", "hydraulic_diameter",
+        "rel_roughness", "path_length", "pitch", "curvature_radius",
+        "wall_thickness", "wall_conductivity",
+        # cold side [m^2, m]
+        "cold_flow_area", "cold_hydraulic_diameter",
+        # constant resistances per length [m*K/W]
+        "R_fouling_inner", "R_wall", "R_fouling_outer",
+    )
+
+    def __init__(self, **values: Any):
+        for name in self.__slots__:
+            object.__setattr__(self, name, values.get(name))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return (_from_dict, ({name: getattr(self, name) for name in self.__slots__},))
+
+    def __repr__(self) -> str:
+        return f"CompiledStage(zone={self.zone!r}, inner_length={self.inner_length!r}, flow_area={self.flow_area!r})"
+
+    @property
+    def R_constant(self) -> float:
+        return self.R_fouling_inner + self.R_wall + self.R_fouling_outer
+
+    @classmethod
+    def from_stage(cls, stage: FirePass | SmokePass | Reversal | Economiser) -> "CompiledStage":
+        hot, cold = stage.hot_side, stage.cold_side
+        wall = hot.wall
+        d_i = hot.inner_diameter.to("m").magnitude
+        d_o = hot.outer_diameter.to("m").magnitude
+        # fire tube, reversal and economiser are single tubes (their perimeters are pi * d)
+        n = hot.tubes_number.to("dimensionless").magnitude if hasattr(hot, "tubes_number") else 1.0
+        P_i = hot.inner_perimeter.to("m").magnitude
+        P_o = hot.outer_perimeter.to("m").magnitude
+        k_w = wall.conductivity.to("W/(m*K)").magnitude
+        f_in, f_out = wall.surfaces.inner, wall.surfaces.outer
+        return cls(
+            stage=stage,
+            zone=type(stage).__name__.lower(),
+            inner_length=hot.inner_length.to("m").magnitude,
+            inner_diameter=d_i,
+            outer_diameter=d_o,
+            tubes_number=n,
+            flow_area=hot.flow_area.to("m^2").magnitude,
+            inner_perimeter=P_i,
+            outer_perimeter=P_o,
+            hydraulic_diameter=hot.hydraulic_diameter.to("m").magnitude,
+            rel_roughness=hot.rel_roughness.to("dimensionless").magnitude,
+            path_length=hot.path_length.to("m").magnitude,
+            pitch=hot.pitch.to("m").magnitude if hasattr(hot, "pitch") else None,
+            curvature_radius=hot.curvature_radius.to("m").magnitude if hasattr(hot, "curvature_radius") else None,
+            wall_thickness=wall.thickness.to("m").magnitude,
+            wall_conductivity=k_w,
+            cold_flow_area=cold.flow_area.to("m^2").magnitude,
+            cold_hydraulic_diameter=cold.hydraulic_diameter.to("m").magnitude,
+            R_fouling_inner=(f_in.fouling_thickness / f_in.fouling_conductivity).to("m^2*K/W").magnitude / P_i,
+            R_wall=log(d_o / d_i) / (2 * pi * k_w),
+            R_fouling_outer=(f_out.fouling_thickness / f_out.fouling_conductivity).to("m^2*K/W").magnitude / P_o,
+        )
+
+def compile_stages(stages: Stages) -> Tuple[CompiledStage, ...]:
+    return tuple(CompiledStage.from_stage(stage) for stage in stages)
@@ -1,14 +1,24 @@
 from __future__ import annotations
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Optional
 import yaml
-import cantera as ct
-from common.units import ureg, Q_
+from common.units import ureg, Q_, unit
 # import your dataclasses here (assumes they are in the same module or adjust import)
 from heat_transfer.config.models import (Wall, Surface, Surfaces, Nozzle, TubeGeometry, ReversalGeometry,
                                          Nozzles, ShellGeometry, FirePass, SmokePass, Reversal, BankGeometry,
                                          Economiser, Stages, GasStream, WaterStream, GasProps, WaterProps,
                                          EconomiserHot, EconomiserCold, Drum)
+from heat_transfer.config.compiled import CompiledStage, compile_stages
+from common.config_cache import load_cached
+
+_BUILDERS = ("heat_transfer.config.loader", "heat_transfer.config.models")
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)      # libyaml when available
+
+@lru_cache(maxsize=16)
+def _parse_yaml(data: bytes) -> Dict[str, Any]:
+    # streams.yaml feeds both stream loaders; parsed once per content
+    return yaml.load(data, Loader=_YAML_LOADER)
 
 class ConfigLoader:
     @staticmethod
@@ -16,10 +26,10 @@ class ConfigLoader:
         if node is None:
             raise ValueError("Expected {{ value, unit }} node, got None")
         value = node.get("value")
-        unit = node.get("unit", "")
-        if unit is None or unit.strip() == "" or unit.strip() == "-":
+        u = node.get("unit", "")
+        if u is None or u.strip() == "" or u.strip() == "-":
             return Q_(value)
-        return Q_(value, ureg(unit))
+        return Q_(value, unit(u))
     
 
     @classmethod
@@ -73,7 +83,7 @@ class ConfigLoader:
 
     @classmethod
     def _build_bank_geometry(cls, node: Dict[str, Any]) -> BankGeometry:
-        return BankGeometry(
+        bank = BankGeometry(
             inner_diameter=cls._qty(node["inner_diameter"]),
             inner_length=cls._qty(node["inner_length"]),
             tubes_number=cls._qty(node["tubes_number"]),
@@ -82,6 +92,10 @@ class ConfigLoader:
             wall=cls._build_wall(node["wall"])
 
         )
+        # pitch is centre-to-centre; the water-side gap velocity needs pitch > outer diameter
+        if bank.pitch <= bank.outer_diameter:
+            raise ValueError(f"Bank pitch {bank.pitch:~P} must exceed the tube outer diameter {bank.outer_diameter.to(bank.pitch.units):~P}")
+        return bank
 
     @classmethod
     def _build_reversal_geometry(cls, node: Dict[str, Any]) -> ReversalGeometry:
@@ -194,24 +208,27 @@ class ConfigLoader:
 
     @classmethod
     def load_stages(cls, path: str | Path) -> Stages:
-        path = Path(path)
-        with path.open("r", encoding="utf-8") as fh:
-            doc = yaml.safe_load(fh)
-        return cls._build_stages(doc["stages"])
+        return load_cached("stages", path, lambda data: cls._build_stages(_parse_yaml(data)["stages"]), _BUILDERS,
+                           frozen=True)
+
 
+    @classmethod
+    def compile_stages(cls, stages: Stages) -> tuple[CompiledStage, ...]:
+        return compile_stages(stages)
+
+    @classmethod
+    def load_compiled_stages(cls, path: str | Path) -> tuple[Stages, tuple[CompiledStage, ...]]:
+        stages = cls.load_stages(path)
+        return stages, compile_stages(stages)
     
     @classmethod
     def load_gas_stream(cls, path: str | Path) -> GasStream:
-        path = Path(path)
-        with path.open("r", encoding="utf-8") as fh:
-            doc = yaml.safe_load(fh)
-        return cls._build_gas_stream(doc["gas_stream"])
+        return load_cached("gas_stream", path, lambda data: cls._build_gas_stream(_parse_yaml(data)["gas_stream"]),
+                           _BUILDERS)
 
     
     @classmethod
     def load_water_stream(cls, path: str | Path) -> WaterStream:
-        path = Path(path)
-        with path.open("r", encoding="utf-8") as fh:
-            doc = yaml.safe_load(fh)
-        return cls._build_water(doc["water_stream"])
+        return load_cached("water_stream", path, lambda data: cls._build_water(_parse_yaml(data)["water_stream"]),
+                           _BUILDERS)
 
@@ -156,6 +156,14 @@ class EconomiserHot:
     @property
     def outer_diameter(self): return self.inner_diameter + 2*self.wall.thickness
 
+    @property
+    def inner_perimeter(self) -> Q_:
+        return pi * self.inner_diameter
+    
+    @property
+    def outer_perimeter(self) -> Q_:
+        return pi * self.outer_diameter
+
     @property
     def hydraulic_diameter(self) -> Q_:
         return self.inner_diameter
@@ -445,7 +453,16 @@ class Film:
     
     @property
     def enthalpy(self) -> Q_:
-        return self.bulk.enthalpy + self.bulk.specific_heat * ( self.temperature - self.bulk.temperature)
+        # Film properties are single-phase: a wall above T_sat would put the film in the
+        # two-phase dome, where IAPWS97 has no transport properties. Liquid and boiling
+        # bulks use the liquid side (saturated liquid at most), superheated bulks the vapour side.
+        h_f = self.bulk.liquid_saturation_enthalpy
+        h_g = h_f + self.bulk.latent_heat_of_vaporization
+        h = self.bulk.enthalpy
+        if h_f < h < h_g:
+            return h_f.to(h.units)
+        h = h + self.bulk.specific_heat * ( self.temperature - self.bulk.temperature)
+        return min(h, h_f.to(h.units)) if self.bulk.enthalpy <= h_f else max(h, h_g.to(h.units))
     
     @property
     def pressure(self) -> Q_:
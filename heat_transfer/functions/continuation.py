@@ -0,0 +1,122 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from math import inf, sqrt
+from typing import Any, Dict, List, Optional
+import numpy as np
+from common.units import Q_
+from heat_transfer.config.models import GasStream, WaterStream
+
+@dataclass(frozen=True)
+class OperatingPoint:
+    gas_mass_flow_rate: float       # kg/s
+    gas_temperature: float          # K
+    water_mass_flow_rate: float     # kg/s
+    drum_pressure: float            # Pa
+
+    @classmethod
+    def from_streams(cls, gas: GasStream, water: WaterStream) -> "OperatingPoint":
+        return cls(
+            gas_mass_flow_rate=gas.mass_flow_rate.to("kg/s").magnitude,
+            gas_temperature=gas.temperature.to("K").magnitude,
+            water_mass_flow_rate=water.mass_flow_rate.to("kg/s").magnitude,
+            drum_pressure=water.pressure.to("Pa").magnitude,
+        )
+
+    def as_tuple(self) -> tuple:
+        return (self.gas_mass_flow_rate, self.gas_temperature, self.water_mass_flow_rate, self.drum_pressure)
+
+    def distance(self, other: "OperatingPoint") -> float:
+        # relative euclidean distance, so flows, temperatures and pressures weigh alike
+        d = 0.0
+        for a, b in zip(self.as_tuple(), other.as_tuple()):
+            scale = max(abs(a), abs(b))
+            if scale > 0.0:
+                d += ((a - b) / scale) ** 2
+        return sqrt(d)
+
+@dataclass(frozen=True)
+class StageSeed:
+    x: np.ndarray           # m, start of each accepted step
+    dx: np.ndarray          # m
+    Twi: np.ndarray         # K
+    Two: np.ndarray         # K
+    qprime: np.ndarray      # W/m
+
+    @classmethod
+    def from_steps(cls, steps: List[Dict[str, Any]]) -> "StageSeed":
+        return cls(
+            x=np.array([s["x"].to("m").magnitude for s in steps]),
+            dx=np.array([s["dx"].to("m").magnitude for s in steps]),
+            Twi=np.array([s["Twi"].to("K").magnitude for s in steps]),
+            Two=np.array([s["Two"].to("K").magnitude for s in steps]),
+            qprime=np.array([s["qprime"].to("W/m").magnitude for s in steps]),
+        )
+
+    def at(self, x: Q_) -> Dict[str, Q_]:
+        xm = x.to("m").magnitude
+        return {
+            "Twi": Q_(float(np.interp(xm, self.x, self.Twi)), "K"),
+            "Two": Q_(float(np.interp(xm, self.x, self.Two)), "K"),
+            "qprime": Q_(float(np.interp(xm, self.x, self.qprime)), "W/m"),
+            "dx": Q_(float(np.interp(xm, self.x, self.dx)), "m"),
+        }
+
+@dataclass(frozen=True)
+class StoredSolution:
+    point: OperatingPoint
+    seeds: List[StageSeed]
+    wall_iterations: List[int]          # per stage, as solved
+    reference_iterations: List[int]     # per stage, cost of the cold solve this one descends from
+
+class SolutionStore:
+    def __init__(self, max_distance: float = inf, max_size: int | None = None):
+        self.max_distance = max_distance
+        self.max_size = max_size        # oldest solutions are dropped beyond this
+        self._solutions: List[StoredSolution] = []
+
+    def __len__(self) -> int:
+        return len(self._solutions)
+
+    def add(self, solution: StoredSolution) -> None:
+        self._solutions = [s for s in self._solutions if s.point != solution.point]
+        self._solutions.append(solution)
+        if self.max_size is not None and len(self._solutions) > self.max_size:
+            del self._solutions[: len(self._solutions) - self.max_size]
+
+    def nearest(self, point: OperatingPoint) -> Optional[StoredSolution]:
+        best, best_d = None, self.max_distance
+        for s in self._solutions:
+            d = point.distance(s.point)
+            if d <= best_d:
+                best, best_d = s, d
+        return best
+
+@dataclass(frozen=True)
+class ContinuationReport:
+    point: OperatingPoint
+    seeded_from: Optional[OperatingPoint]
+    wall_iterations: List[int]
+    reference_iterations: List[int]
+
+    @property
+    def saved_iterations(self) -> List[int]:
+        return [r - w for r, w in zip(self.reference_iterations, self.wall_iterations)]
+
+    @property
+    def total_saved(self) -> int:
+        return sum(self.saved_iterations)
+
+    def __str__(self) -> str:
+        out = ["=== Continuation Report ==="]
+        if self.seeded_from is None:
+            out.append("Cold solve (no stored solution in range)")
+        else:
+            out.append(f"Seeded from: {self.seeded_from}  (distance {self.point.distance(self.seeded_from):.4f})")
+        out.append(f"{'stage':>6} {'wall it.':>9} {'reference':>10} {'saved':>7}")
+        for i, (w, r) in enumerate(zip(self.wall_iterations, self.reference_iterations), start=1):
+            out.append(f"{'HX_' + str(i):>6} {w:>9d} {r:>10d} {r - w:>7d}")
+        total_w, total_r = sum(self.wall_iterations), sum(self.reference_iterations)
+        out.append(f"{'total':>6} {total_w:>9d} {total_r:>10d} {total_r - total_w:>7d}")
+        return "\n".join(out)
+
+    __repr__ = __str__
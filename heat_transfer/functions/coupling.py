@@ -0,0 +1,92 @@
+from __future__ import annotations
+import copy
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+from common.units import Q_
+from heat_transfer.config.models import Stages, GasStream, WaterStream
+from heat_transfer.functions.stages_chain import six_stage_counterflow
+from heat_transfer.functions.continuation import SolutionStore
+from thermo.config.schemas import Settings
+from thermo.core.composition import Composition
+from thermo.core.streams import GasStream as ThermoGasStream
+from thermo.models.combustion_case import CombustionCase
+from thermo.models.results import Results
+from thermo.services.combustor import build_combustor
+
+def case_from_settings(settings: Settings, fuel_mass_flow: Q_ | None = None, air_T: Q_ | None = None,
+                       excess_air_ratio: float | None = None) -> CombustionCase:
+    # the thermo_run.py case, with optional operating-point overrides
+    s = settings
+    air = ThermoGasStream(
+        T=(air_T if air_T is not None else s.air_T).to("K"),
+        P=s.air_P,
+        composition=Composition(s.air_composition_mol, "mole"),
+    )
+    fuel = ThermoGasStream(
+        T=s.fuel_T.to("K"),
+        P=s.fuel_P,
+        composition=Composition(s.fuel_composition_mass, "mass"),
+        flow_mass=fuel_mass_flow if fuel_mass_flow is not None else s.fuel_mass_flow,
+    )
+    return CombustionCase(air=air, fuel=fuel,
+                          excess_air_ratio=excess_air_ratio if excess_air_ratio is not None else s.excess_air_ratio,
+                          T_ref=s.T_ref)
+
+def gas_stream_from_results(results: Results, pressure: Q_, spectroscopic_data: Dict[str, Q_]) -> GasStream:
+    # flue gas leaves the combustor at T_ad with the combustor's mole fractions
+    composition = {k: Q_(float(Results._mag(v)), "dimensionless") for k, v in results.flue_x.items()}
+    missing = set(composition) - set(spectroscopic_data)
+    if missing:
+        raise ValueError(f"No spectroscopic data for flue species: {sorted(missing)}")
+    return GasStream(
+        mass_flow_rate=results.flue_mass_flow_kg_s.to("kg/s"),
+        temperature=results.T_ad_K.to("K"),
+        pressure=pressure,
+        composition=composition,
+        spectroscopic_data=dict(spectroscopic_data),
+        stage=None,
+    )
+
+@dataclass(frozen=True)
+class CoupledResult:
+    combustion: Results
+    gas_in: GasStream
+    gas_out: GasStream
+    water_out: WaterStream
+    gas_profile: Optional[List[GasStream]] = None
+    water_profile: Optional[List[WaterStream]] = None
+
+class CombustionBoilerPipeline:
+    # One Combustor and one boiler chain per process: CoolProp states, the
+    # Cantera Solution and IAPWS97 states stay warm from one case to the next.
+    def __init__(self, settings: Settings, stages: Stages, gas: GasStream, water: WaterStream,
+                 store: SolutionStore | None = None):
+        self.s = settings
+        self.stages = stages
+        self.gas = gas              # template: furnace pressure and spectroscopic data
+        self.water = water          # boiler feedwater inlet
+        self.store = store
+        self.combustor = build_combustor(settings)
+
+    def gas_inlet(self, results: Results) -> GasStream:
+        return gas_stream_from_results(results, self.gas.pressure, self.gas.spectroscopic_data)
+
+    def run(self, case: CombustionCase, water: WaterStream | None = None, profiles: bool = False) -> CoupledResult:
+        res = self.combustor.run(case)
+        gas_in = self.gas_inlet(res)
+        gas = copy.deepcopy(gas_in)
+        water = copy.deepcopy(water if water is not None else self.water)
+        gas_hist, water_hist = six_stage_counterflow(stages=self.stages, store=self.store).run(gas=gas, water=water)
+        # gas and water were advanced in place to the boiler outlet
+        return CoupledResult(
+            combustion=res,
+            gas_in=gas_in,
+            gas_out=gas,
+            water_out=water,
+            gas_profile=gas_hist if profiles else None,
+            water_profile=water_hist if profiles else None,
+        )
+
+    def run_batch(self, cases: Iterable[CombustionCase], profiles: bool = False) -> Iterator[CoupledResult]:
+        for case in cases:
+            yield self.run(case, profiles=profiles)
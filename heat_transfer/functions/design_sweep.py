@@ -0,0 +1,166 @@
+from __future__ import annotations
+import copy
+import dataclasses
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from itertools import product
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+from common.units import Q_
+from common.result_cache import canonical
+from heat_transfer.config.loader import ConfigLoader
+from heat_transfer.config.models import Stages, GasStream, WaterStream
+from heat_transfer.functions.fluid_props import GasProps
+from heat_transfer.functions.stages_chain import six_stage_counterflow
+from heat_transfer.functions.lumped import six_stage_lumped
+from heat_transfer.functions.stage_memo import StageMemo
+
+@dataclass(frozen=True)
+class GeometryChange:
+    stage: str          # "HX_1" .. "HX_6"
+    field: str          # hot_side field, e.g. "tubes_number", "pitch", "inner_diameter", "inner_length"
+    value: Q_
+
+@dataclass(frozen=True)
+class Variant:
+    name: str
+    changes: Tuple[GeometryChange, ...] = ()
+
+    def apply(self, stages: Stages) -> Stages:
+        for ch in self.changes:
+            stage = getattr(stages, ch.stage)
+            if not any(f.name == ch.field for f in dataclasses.fields(stage.hot_side)):
+                raise ValueError(f"{ch.stage}.hot_side ({type(stage.hot_side).__name__}) has no field '{ch.field}'")
+            hot = dataclasses.replace(stage.hot_side, **{ch.field: ch.value})
+            stages = dataclasses.replace(stages, **{ch.stage: dataclasses.replace(stage, hot_side=hot)})
+        return stages
+
+def grid(axes: Dict[Tuple[str, str], Sequence[Q_]]) -> List[Variant]:
+    # full factorial over {(stage, field): values}
+    keys = list(axes)
+    variants = []
+    for values in product(*(axes[k] for k in keys)):
+        changes = tuple(GeometryChange(stage, field, v) for (stage, field), v in zip(keys, values))
+        name = ", ".join(f"{c.stage}.{c.field}={c.value:~P}" for c in changes)
+        variants.append(Variant(name=name, changes=changes))
+    return variants
+
+@dataclass(frozen=True)
+class VariantResult:
+    variant: Variant
+    duty: Q_ | None = None
+    gas_temperature_out: Q_ | None = None
+    water_temperature_out: Q_ | None = None
+    gas_pressure_drop: Q_ | None = None
+    reused_stages: int = 0              # stages taken from the worker's StageMemo
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+######################### Worker #########################
+# Base stages and inlet streams go to each worker once; variants only carry their
+# geometry changes. The fluids are the same for every variant, so the Cantera,
+# IAPWS and CoolProp caches a worker builds serve all variants it solves. With
+# memo=True a worker also keeps the stages it solved, so a variant that changes
+# only downstream stages re-solves just those.
+_SWEEP: Dict[str, Any] = {}
+
+def _init_sweep_worker(stages: Stages, gas: GasStream, water: WaterStream, memo: bool = False) -> None:
+    _SWEEP["stages"] = stages
+    _SWEEP["gas"] = gas
+    _SWEEP["water"] = water
+    _SWEEP["memo"] = StageMemo() if memo else None
+    GasProps.specific_heat(gas)
+
+def _solve_variant(variant: Variant, mode: str) -> VariantResult:
+    gas, water = copy.deepcopy(_SWEEP["gas"]), copy.deepcopy(_SWEEP["water"])
+    p_in, h_in = gas.pressure, water.enthalpy
+    try:
+        stages = variant.apply(_SWEEP["stages"])
+        reused = 0
+        if mode == "lumped":
+            six_stage_lumped(stages=stages).run(gas=gas, water=water)
+        else:
+            chain = six_stage_counterflow(stages=stages, memo=_SWEEP.get("memo"))
+            chain.run(gas=gas, water=water, history=False)
+            reused = sum(chain.reused)
+        return VariantResult(
+            variant=variant,
+            duty=(water.mass_flow_rate * (water.enthalpy - h_in)).to("kW"),
+            gas_temperature_out=gas.temperature,
+            water_temperature_out=water.temperature,
+            gas_pressure_drop=(p_in - gas.pressure).to("Pa"),
+            reused_stages=reused,
+        )
+    except Exception as exc:
+        return VariantResult(variant=variant, error=f"{type(exc).__name__}: {exc}")
+
+def _solve_variants(variants: List[Variant], mode: str) -> List[VariantResult]:
+    return [_solve_variant(v, mode) for v in variants]
+
+class DesignSweep:
+    def __init__(self, stages_path: str | Path, streams_path: str | Path, processes: int | None = None,
+                 mode: str = "march", memo: bool = False):
+        if mode not in ("march", "lumped"):
+            raise ValueError(f"Unknown sweep mode: {mode}")
+        self.stages = ConfigLoader.load_stages(stages_path)
+        self.gas = ConfigLoader.load_gas_stream(streams_path)
+        self.water = ConfigLoader.load_water_stream(streams_path)
+        self.processes = processes
+        self.mode = mode        # "lumped" screens with the epsilon-NTU mode
+        self.memo = memo and mode == "march"    # reuse solved upstream stages across variants
+
+    def run(self, variants: Iterable[Variant], key: str = "duty", descending: bool = True) -> List[VariantResult]:
+        variants = list(variants)
+        if self.memo:
+            variants = self._by_prefix(variants)
+        if self.processes == 0:
+            _init_sweep_worker(self.stages, self.gas, self.water, self.memo)
+            results = [_solve_variant(v, self.mode) for v in variants]
+        else:
+            with ProcessPoolExecutor(max_workers=self.processes, initializer=_init_sweep_worker,
+                                     initargs=(self.stages, self.gas, self.water, self.memo)) as pool:
+                if self.memo:
+                    # contiguous runs of the prefix order, so shared prefixes meet in one worker's memo
+                    n = max(1, min(len(variants), self.processes or os.cpu_count() or 1))
+                    size = -(-len(variants) // n)
+                    futures = [pool.submit(_solve_variants, variants[i:i + size], self.mode)
+                               for i in range(0, len(variants), size)]
+                    results = [r for fut in as_completed(futures) for r in fut.result()]
+                else:
+                    futures = [pool.submit(_solve_variant, v, self.mode) for v in variants]
+                    results = [fut.result() for fut in as_completed(futures)]
+        return rank(results, key=key, descending=descending)
+
+    def _by_prefix(self, variants: List[Variant]) -> List[Variant]:
+        # variants that share their upstream stages end up next to each other
+        def order(v: Variant):
+            try:
+                return tuple(json.dumps(canonical(stage), sort_keys=True) for stage in v.apply(self.stages))
+            except ValueError:
+                return ()           # reported by _solve_variant
+        return sorted(variants, key=order)
+
+def rank(results: Iterable[VariantResult], key: str = "duty", descending: bool = True) -> List[VariantResult]:
+    # failed variants sort last
+    results = list(results)
+    ok = [r for r in results if r.ok]
+    failed = [r for r in results if not r.ok]
+    ok.sort(key=lambda r: getattr(r, key).to_base_units().magnitude, reverse=descending)
+    return ok + failed
+
+def format_table(results: Sequence[VariantResult]) -> str:
+    out = [f"{'#':>3} {'duty [kW]':>11} {'T_gas,out [K]':>14} {'T_w,out [K]':>12} {'dp_gas [Pa]':>12}  variant"]
+    for i, r in enumerate(results, start=1):
+        if r.ok:
+            out.append(f"{i:>3} {r.duty.to('kW').m:>11,.1f} {r.gas_temperature_out.to('K').m:>14,.2f} "
+                       f"{r.water_temperature_out.to('K').m:>12,.2f} {r.gas_pressure_drop.to('Pa').m:>12,.1f}  "
+                       f"{r.variant.name}")
+        else:
+            error = " ".join(r.error.replace("*", "").split())
+            out.append(f"{i:>3} {'failed':>11} {'':>14} {'':>12} {'':>12}  {r.variant.name}: {error}")
+    return "\n".join(out)
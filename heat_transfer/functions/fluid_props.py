@@ -1,13 +1,78 @@
 from __future__ import annotations  # at top of every module
+import os
 from common.units import Q_, Converter
-import cantera as ct
-from iapws import IAPWS97
+from common.instrumentation import instrumented
+from functools import lru_cache
+
+CANTERA_MECHANISM = "heat_transfer/config/flue_cantera.yaml"
+
+######################### Warm caches #########################
+# One Solution per process; IAPWS97 states memoized by their exact inputs.
+# cantera and iapws are imported on first use, so loading the config models
+# does not pull them in.
+@lru_cache(maxsize=None)
+@instrumented("ct.Solution")
+def _solution(mechanism: str = CANTERA_MECHANISM) -> ct.Solution:
+    import cantera as ct
+    return ct.Solution(mechanism)
+
+@lru_cache(maxsize=None)
+def _iapws97():
+    from iapws import IAPWS97
+    return IAPWS97
+
+@lru_cache(maxsize=8192)
+@instrumented("IAPWS97")
+def _iapws_px(P: float, x: float) -> IAPWS97:
+    return _iapws97()(P=P, x=x)
+
+@lru_cache(maxsize=8192)
+@instrumented("IAPWS97")
+def _iapws_ph(P: float, h: float) -> IAPWS97:
+    return _iapws97()(P=P, h=h)
+
+######################### Water backend #########################
+# WaterProps evaluates states with iapws.IAPWS97 ("iapws", default) or with the
+# NumPy IF97 regions 1/2/4 in if97.py ("if97"). Both expose the same attributes.
+#   BOILER_WATER_BACKEND=if97
+WATER_BACKEND_ENV = "BOILER_WATER_BACKEND"
+WATER_BACKENDS = ("iapws", "if97")
+_water_backend = {"name": None}
+
+def water_backend() -> str:
+    if _water_backend["name"] is None:
+        set_water_backend(os.environ.get(WATER_BACKEND_ENV) or "iapws")
+    return _water_backend["name"]
+
+def set_water_backend(name: str) -> None:
+    if name not in WATER_BACKENDS:
+        raise ValueError(f"Unknown water backend '{name}' (known: {', '.join(WATER_BACKENDS)})")
+    _water_backend["name"] = name
+
+@lru_cache(maxsize=8192)
+@instrumented("if97.State")
+def _if97_px(P: float, x: float):
+    from heat_transfer.functions.if97 import State
+    return State(P, x=x)
+
+@lru_cache(maxsize=8192)
+@instrumented("if97.State")
+def _if97_ph(P: float, h: float):
+    from heat_transfer.functions.if97 import State
+    return State(P, h=h)
+
+def _water_px(P: float, x: float):
+    return _if97_px(P, x) if water_backend() == "if97" else _iapws_px(P, x)
+
+def _water_ph(P: float, h: float):
+    return _if97_ph(P, h) if water_backend() == "if97" else _iapws_ph(P, h)
 
 class GasProps:
     ######################### Function #########################
     @staticmethod
+    @instrumented("GasProps._set_state")
     def _set_state(gas, film_temperature: Q_ | None):
-        sol = ct.Solution("heat_transfer/config/flue_cantera.yaml")
+        sol = _solution()
         T = (film_temperature or gas.temperature).to("K").magnitude
         P = gas.pressure.to("Pa").magnitude
         X = {k: v.magnitude for k, v in gas.composition.items()}
@@ -15,26 +80,31 @@ class GasProps:
         return sol
     ######################### Properties #########################
     @staticmethod
+    @instrumented("GasProps.thermal_conductivity")
     def thermal_conductivity(gas, film_temperature: Q_ | None = None):
         sol = GasProps._set_state(gas, film_temperature)
         return Q_(sol.thermal_conductivity, "W/(m*K)")
     
     @staticmethod
+    @instrumented("GasProps.viscosity")
     def viscosity(gas, film_temperature: Q_ | None = None):
         sol = GasProps._set_state(gas, film_temperature)
         return Q_(sol.viscosity, "Pa*s")
     
     @staticmethod
+    @instrumented("GasProps.density")
     def density(gas, film_temperature: Q_ | None = None):
         sol = GasProps._set_state(gas, film_temperature)
         return Q_(sol.density, "kg/m^3")
     
     @staticmethod
+    @instrumented("GasProps.enthalpy")
     def enthalpy(gas, film_temperature: Q_ | None = None):
         sol = GasProps._set_state(gas, film_temperature)
         return Q_(sol.enthalpy_mass, "J/kg")
     
     @staticmethod
+    @instrumented("GasProps.specific_heat")
     def specific_heat(gas, film_temperature: Q_ | None = None):
         sol = GasProps._set_state(gas, film_temperature)
         return Q_(sol.cp_mass, "J/(kg*K)")
@@ -43,75 +113,89 @@ class GasProps:
 class WaterProps:
     ######################### Functions ######################### 
     @staticmethod
+    @instrumented("WaterProps.sat_liq")
     def sat_liq(water) -> IAPWS97:
         P = Converter._MPa(water.pressure).magnitude
-        return IAPWS97(P=P, x=0.0)
+        return _water_px(P, 0.0)
 
     @staticmethod
+    @instrumented("WaterProps.sat_vap")
     def sat_vap(water) -> IAPWS97:
         P = Converter._MPa(water.pressure).magnitude
-        return IAPWS97(P=P, x=1.0)
+        return _water_px(P, 1.0)
 
     @staticmethod
+    @instrumented("WaterProps._state")
     def _state(water) -> IAPWS97:
         P = Converter._MPa(water.pressure).magnitude
         h = getattr(water, "enthalpy", None)
         x = getattr(water, "quality", None)
 
         if x is not None:
-            return IAPWS97(P=P, x=Converter._dim(x).magnitude)
+            return _water_px(P, Converter._dim(x).magnitude)
         if h is not None:
-            return IAPWS97(P=P, h=Converter._kJkg(h).magnitude)
+            return _water_ph(P, Converter._kJkg(h).magnitude)
         raise ValueError("Provide one of: enthalpy, or quality.")
 
     ######################### Saturation Properties #########################
     @staticmethod
+    @instrumented("WaterProps.saturation_temperature")
     def saturation_temperature(water) -> Q_:
         return Q_(WaterProps.sat_liq(water).T, "K")
 
     @staticmethod
+    @instrumented("WaterProps.saturation_enthalpy_liquid")
     def saturation_enthalpy_liquid(water) -> Q_:
         return Q_(WaterProps.sat_liq(water).h, "kJ/kg")
 
     @staticmethod
+    @instrumented("WaterProps.latent_heat")
     def latent_heat(water) -> Q_:
         s_l = WaterProps.sat_liq(water)
         s_v = WaterProps.sat_vap(water)
         return Q_(s_v.h - s_l.h, "kJ/kg")
 
     @staticmethod
+    @instrumented("WaterProps.surface_tension")
     def surface_tension(water) -> Q_:
         s = WaterProps.sat_liq(water)
         return Q_(s.sigma, "N/m")
 
     ######################### Properties at specified state #########################
     @staticmethod
+    @instrumented("WaterProps.temperature")
     def temperature(water) -> Q_:
         return Q_(WaterProps._state(water).T, "K")
 
     @staticmethod
+    @instrumented("WaterProps.density")
     def density(water) -> Q_:
         return Q_(WaterProps._state(water).rho, "kg/m^3")
 
     @staticmethod
+    @instrumented("WaterProps.dynamic_viscosity")
     def dynamic_viscosity(water) -> Q_:
         return Q_(WaterProps._state(water).mu, "Pa*s")
 
     @staticmethod
+    @instrumented("WaterProps.thermal_conductivity")
     def thermal_conductivity(water) -> Q_:
         return Q_(WaterProps._state(water).k, "W/m/K")
 
     @staticmethod
+    @instrumented("WaterProps.specific_heat_cp")
     def specific_heat_cp(water) -> Q_:
         return Q_(WaterProps._state(water).cp, "kJ/kg/K")
     
     @staticmethod
+    @instrumented("WaterProps.enthalpy")
     def enthalpy(water) -> Q_:
         return Q_(WaterProps._state(water).h, "kJ/kg")
 
 
     ######################### Utilities #########################
     @staticmethod
+    @instrumented("WaterProps.quality_from_h")
     def quality_from_h(water) -> Q_:
         h = Converter._kJkg(water.enthalpy).magnitude
         h_f = WaterProps.sat_liq(water).h
@@ -1,43 +1,45 @@
 from heat_transfer.config.models import GasStream, WaterStream, FirePass, SmokePass, Reversal, Economiser
+from heat_transfer.config.compiled import CompiledStage
 from heat_transfer.functions.htc_water import WaterHTC
-from common.units import Q_
-from math import pi, log
+from common.units import ureg, Q_
+
+_m = ureg.meter
+_R = ureg.meter * ureg.kelvin / ureg.watt      # resistance per length
 
 class HeatRate:
-    def __init__(self, stage: FirePass | SmokePass | Reversal | Economiser, gas: GasStream, water: WaterStream):
+    def __init__(self, stage: FirePass | SmokePass | Reversal | Economiser, gas: GasStream, water: WaterStream, geom: CompiledStage | None = None):
         self.stage = stage
         self.gas = gas
         self.water = water
+        self.geom = geom if geom is not None else CompiledStage.from_stage(stage)
 
     def gas_resistance_per_length(self) -> Q_:
-        return 1 / ( self.gas.htc * self.stage.hot_side.inner_perimeter )
+        return 1 / ( self.gas.htc * Q_(self.geom.inner_perimeter, _m) )
     
     def inner_fouling_resistance_per_length(self) -> Q_:
-        return self.stage.hot_side.wall.surfaces.inner.fouling_thickness / ( self.stage.hot_side.wall.surfaces.inner.fouling_conductivity * self.stage.hot_side.inner_perimeter )
+        return Q_(self.geom.R_fouling_inner, _R)
 
     def wall_resistance_per_length(self) -> Q_:
-        return log ( self.stage.hot_side.outer_diameter / self.stage.hot_side.inner_diameter ) / ( 2 * pi * self.stage.hot_side.wall.conductivity )
+        return Q_(self.geom.R_wall, _R)
 
     def outer_fouling_resistance_per_length(self) -> Q_:
-        return self.stage.hot_side.wall.surfaces.outer.fouling_thickness / ( self.stage.hot_side.wall.surfaces.outer.fouling_conductivity * self.stage.hot_side.outer_perimeter )
+        return Q_(self.geom.R_fouling_outer, _R)
     
     def water_resistance_per_length(self) -> Q_:
         qprime = getattr(self, "qprime", None)
         if qprime is None:
             h = WaterHTC.htc_conv(self.water)
         else:
-            self.water.q_flux = qprime / self.stage.hot_side.outer_perimeter
+            self.water.q_flux = qprime / Q_(self.geom.outer_perimeter, _m)
             h = WaterHTC.calc_htc(self.water)
-        return 1 / (h * self.stage.hot_side.outer_perimeter)
+        return 1 / (h * Q_(self.geom.outer_perimeter, _m))
     
     def total_resistance_per_length(self) -> Q_:
         return ( 
             self.gas_resistance_per_length() 
-            + self.inner_fouling_resistance_per_length() 
-            + self.wall_resistance_per_length() 
-            + self.outer_fouling_resistance_per_length() 
+            + Q_(self.geom.R_constant, _R)
             + self.water_resistance_per_length() 
         )
     
     def heat_rate_per_length(self) -> Q_:
-        return ( self.gas.temperature - self.water.temperature ) / self.total_resistance_per_length()
\ No newline at end of file
+        return ( self.gas.temperature - self.water.temperature ) / self.total_resistance_per_length()
@@ -4,6 +4,7 @@ from common.units import Q_
 from heat_transfer.config.models import WaterStream, GasStream, FirePass, SmokePass, Reversal, Economiser
 
 Zone  = Literal["firepass", "smokepass", "reversal", "economiser"]
+Regime = Literal["liquid", "boiling", "vapour"]
 
 class WaterHTC:
 
@@ -62,10 +63,17 @@ class WaterHTC:
         return Q_(h_nb, "W/(m^2*K)")
 
 
-    def calc_htc(water):
+    @staticmethod
+    def regime(water) -> Regime:
         if water.enthalpy < water.liquid_saturation_enthalpy:
-            return WaterHTC.htc_conv(water)
+            return "liquid"
         elif water.enthalpy > (water.liquid_saturation_enthalpy + water.latent_heat_of_vaporization):
+            return "vapour"
+        else:
+            return "boiling"
+
+    def calc_htc(water):
+        if WaterHTC.regime(water) != "boiling":
             return WaterHTC.htc_conv(water)
         else:
             return ( water.S_factor * WaterHTC.htc_conv(water) ) + ( water.F_factor * WaterHTC.htc_nb(water) )
@@ -0,0 +1,296 @@
+from __future__ import annotations
+from functools import cached_property
+from typing import Dict, Sequence
+import numpy as np
+
+# IAPWS-IF97 regions 1, 2 and 4 evaluated directly on NumPy arrays of (P, h).
+# Units follow the iapws package: P in MPa, h in kJ/kg, T in K, cp in kJ/(kg K),
+# rho in kg/m^3, mu in Pa s, k in W/(m K), sigma in N/m. Transport properties use
+# the same IAPWS 2008 viscosity and 2011 conductivity (industrial critical
+# enhancement) as iapws.IAPWS97. Valid for P up to Psat(623.15 K) = 16.529 MPa,
+# where region 3 is never reached, and T up to 1073.15 K.
+
+R = 0.461526            # kJ/(kg K)
+TC = 647.096            # K
+PC = 22.064             # MPa
+RHOC = 322.0            # kg/m^3
+P_MIN = 611.212677e-6   # MPa, triple point
+P_MAX = 16.529164253    # MPa, Psat(623.15 K)
+T_MAX = 1073.15         # K
+
+######################### Region 4 (saturation line) #########################
+_N4 = (0.11670521452767e4, -0.72421316703206e6, -0.17073846940092e2, 0.12020824702470e5,
+       -0.32325550322333e7, 0.14915108613530e2, -0.48232657361591e4, 0.40511340542057e6,
+       -0.23855557567849, 0.65017534844798e3)
+
+def psat(T) -> np.ndarray:
+    n = _N4
+    T = np.asarray(T, dtype=float)
+    th = T + n[8] / (T - n[9])
+    A = th**2 + n[0] * th + n[1]
+    B = n[2] * th**2 + n[3] * th + n[4]
+    C = n[5] * th**2 + n[6] * th + n[7]
+    return (2 * C / (-B + np.sqrt(B**2 - 4 * A * C)))**4
+
+def tsat(P) -> np.ndarray:
+    n = _N4
+    beta = np.asarray(P, dtype=float)**0.25
+    E = beta**2 + n[2] * beta + n[5]
+    F = n[0] * beta**2 + n[3] * beta + n[6]
+    G = n[1] * beta**2 + n[4] * beta + n[7]
+    D = 2 * G / (-F - np.sqrt(F**2 - 4 * E * G))
+    return (n[9] + D - np.sqrt((n[9] + D)**2 - 4 * (n[8] + n[9] * D))) / 2
+
+######################### Region 1 (liquid) #########################
+_I1 = np.array([0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 3, 3, 3, 4, 4, 4, 5, 8, 8, 21, 23, 29, 30,
+                31, 32], dtype=float)
+_J1 = np.array([-2, -1, 0, 1, 2, 3, 4, 5, -9, -7, -1, 0, 1, 3, -3, 0, 1, 3, 17, -4, 0, 6, -5, -2, 10, -8, -11, -6,
+                -29, -31, -38, -39, -40, -41], dtype=float)
+_N1 = np.array([
+    0.14632971213167, -0.84548187169114, -3.756360367204, 3.3855169168385, -0.95791963387872, 0.15772038513228,
+    -0.016616417199501, 0.81214629983568e-3, 0.28319080123804e-3, -0.60706301565874e-3, -0.018990068218419,
+    -0.032529748770505, -0.021841717175414, -0.5283835796993e-4, -0.47184321073267e-3, -0.30001780793026e-3,
+    0.47661393906987e-4, -0.44141845330846e-5, -0.72694996297594e-15, -0.31679644845054e-4, -0.28270797985312e-5,
+    -0.85205128120103e-9, -0.22425281908e-5, -0.65171222895601e-6, -0.14341729937924e-12, -0.40516996860117e-6,
+    -0.12734301741641e-8, -0.17424871230634e-9, -0.68762131295531e-18, 0.14478307828521e-19, 0.26335781662795e-22,
+    -0.11947622640071e-22, 0.18228094581404e-23, -0.93537087292458e-25])
+
+def region1(T, P) -> Dict[str, np.ndarray]:
+    T = np.asarray(T, dtype=float)[..., None]
+    P = np.asarray(P, dtype=float)[..., None]
+    a = 7.1 - P / 16.53
+    tau = 1386.0 / T
+    b = tau - 1.222
+    I, J, n = _I1, _J1, _N1
+    g_p = -np.sum(n * I * a**(I - 1) * b**J, axis=-1)
+    g_pp = np.sum(n * I * (I - 1) * a**(I - 2) * b**J, axis=-1)
+    g_t = np.sum(n * J * a**I * b**(J - 1), axis=-1)
+    g_tt = np.sum(n * J * (J - 1) * a**I * b**(J - 2), axis=-1)
+    g_pt = -np.sum(n * I * J * a**(I - 1) * b**(J - 1), axis=-1)
+    T, tau = T[..., 0], tau[..., 0]
+    v = R * T * g_p / 16.53 / 1000
+    return {
+        "h": R * T * tau * g_t,
+        "v": v,
+        "cp": -R * tau**2 * g_tt,
+        "cv": R * (-tau**2 * g_tt + (g_p - tau * g_pt)**2 / g_pp),
+        "drhodP": -R * T * g_pp / 16.53**2 / 1000 / v**2,     # (kg/m^3)/MPa at constant T
+    }
+
+######################### Region 2 (vapour) #########################
+_J0 = np.array([0, 1, -5, -4, -3, -2, -1, 2, 3], dtype=float)
+_N0 = np.array([-9.6927686500217, 10.086655968018, -0.005608791128302, 0.071452738081455, -0.40710498223928,
+                1.4240819171444, -4.383951131945, -0.28408632460772, 0.021268463753307])
+_I2 = np.array([1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 3, 3, 3, 3, 3, 4, 4, 4, 5, 6, 6, 6, 7, 7, 7, 8, 8, 9, 10, 10, 10, 16, 16,
+                18, 20, 20, 20, 21, 22, 23, 24, 24, 24], dtype=float)
+_J2 = np.array([0, 1, 2, 3, 6, 1, 2, 4, 7, 36, 0, 1, 3, 6, 35, 1, 2, 3, 7, 3, 16, 35, 0, 11, 25, 8, 36, 13, 4, 10, 14,
+                29, 50, 57, 20, 35, 48, 21, 53, 39, 26, 40, 58], dtype=float)
+_N2 = np.array([
+    -0.0017731742473213, -0.017834862292358, -0.045996013696365, -0.057581259083432, -0.05032527872793,
+    -0.33032641670203e-4, -0.18948987516315e-3, -0.0039392777243355, -0.043797295650573, -0.26674547914087e-4,
+    0.20481737692309e-7, 0.43870667284435e-6, -0.3227767723857e-4, -0.0015033924542148, -0.040668253562649,
+    -0.78847309559367e-9, 0.12790717852285e-7, 0.48225372718507e-6, 0.22922076337661e-5, -0.16714766451061e-10,
+    -0.0021171472321355, -23.895741934104, -0.5905956432427e-17, -0.12621808899101e-5, -0.038946842435739,
+    0.11256211360459e-10, -8.2311340897998, 0.19809712802088e-7, 0.10406965210174e-18, -0.10234747095929e-12,
+    -0.10018179379511e-8, -0.80882908646985e-10, 0.10693031879409, -0.33662250574171, 0.89185845355421e-24,
+    0.30629316876232e-12, -0.42002467698208e-5, -0.59056029685639e-25, 0.37826947613457e-5, -0.12768608934681e-14,
+    0.73087610595061e-28, 0.55414715350778e-16, -0.9436970724121e-6])
+
+def region2(T, P) -> Dict[str, np.ndarray]:
+    T = np.asarray(T, dtype=float)[..., None]
+    pi = np.asarray(P, dtype=float)[..., None]     # P* = 1 MPa
+    tau = 540.0 / T
+    b = tau - 0.5
+    I, J, n = _I2, _J2, _N2
+    g0_t = np.sum(_N0 * _J0 * tau**(_J0 - 1), axis=-1)
+    g0_tt = np.sum(_N0 * _J0 * (_J0 - 1) * tau**(_J0 - 2), axis=-1)
+    gr_p = np.sum(n * I * pi**(I - 1) * b**J, axis=-1)
+    gr_pp = np.sum(n * I * (I - 1) * pi**(I - 2) * b**J, axis=-1)
+    gr_t = np.sum(n * J * pi**I * b**(J - 1), axis=-1)
+    gr_tt = np.sum(n * J * (J - 1) * pi**I * b**(J - 2), axis=-1)
+    gr_pt = np.sum(n * I * J * pi**(I - 1) * b**(J - 1), axis=-1)
+    T, tau, pi = T[..., 0], tau[..., 0], pi[..., 0]
+    v = R * T * (1 / pi + gr_p) / 1000
+    return {
+        "h": R * T * tau * (g0_t + gr_t),
+        "v": v,
+        "cp": -R * tau**2 * (g0_tt + gr_tt),
+        "cv": R * (-tau**2 * (g0_tt + gr_tt) - (1 + pi * gr_p - tau * pi * gr_pt)**2 / (1 - pi**2 * gr_pp)),
+        "drhodP": -R * T * (-1 / pi**2 + gr_pp) / 1000 / v**2,
+    }
+
+######################### Transport #########################
+_HMU0 = np.array([1.67752, 2.20462, 0.6366564, -0.241605])
+_IMU = np.array([0, 1, 2, 3, 0, 1, 2, 3, 5, 0, 1, 2, 3, 4, 0, 1, 0, 3, 4, 3, 5], dtype=float)
+_JMU = np.array([0, 0, 0, 0, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 3, 3, 4, 4, 5, 6, 6], dtype=float)
+_HMU1 = np.array([0.520094, 0.850895e-1, -0.108374e1, -0.289555, 0.222531, 0.999115, 0.188797e1, 0.126613e1,
+                  0.120573, -0.281378, -0.906851, -0.772479, -0.489837, -0.257040, 0.161913, 0.257399, -0.325372e-1,
+                  0.698452e-1, 0.872102e-2, -0.435673e-2, -0.593264e-3])
+
+def viscosity(rho, T) -> np.ndarray:
+    # IAPWS 2008 without the critical enhancement (mu2 = 1), as iapws.IAPWS97
+    Tr = np.asarray(T, dtype=float) / TC
+    d = np.asarray(rho, dtype=float) / RHOC
+    mu0 = 100 * np.sqrt(Tr) / sum(H / Tr**i for i, H in enumerate(_HMU0))
+    s = np.sum(_HMU1 * (1 / Tr[..., None] - 1)**_IMU * (d[..., None] - 1)**_JMU, axis=-1)
+    return mu0 * np.exp(d * s) * 1e-6
+
+_NK0 = np.array([2.443221e-3, 1.323095e-2, 6.770357e-3, -3.454586e-3, 4.096266e-4])
+_IK = np.repeat(np.arange(5.0), [6, 6, 6, 4, 6])
+_JK = np.array([0, 1, 2, 3, 4, 5] * 3 + [0, 1, 2, 3] + [0, 1, 2, 3, 4, 5], dtype=float)
+_NK1 = np.array([1.60397357, -0.646013523, 0.111443906, 0.102997357, -0.0504123634, 0.00609859258, 2.33771842,
+                 -2.78843778, 1.53616167, -0.463045512, 0.0832827019, -0.00719201245, 2.19650529, -4.54580785,
+                 3.55777244, -1.40944978, 0.275418278, -0.0205938816, -1.21051378, 1.60812989, -0.621178141,
+                 0.0716373224, -2.7203370, 4.57586331, -3.18369245, 1.1168348, -0.19268305, 0.012913842])
+_AK = np.array([   # industrial (drho/dP)_T at the reference temperature, by reduced density band
+    [6.53786807199516, -5.61149954923348, 3.39624167361325, -2.27492629730878, 10.2631854662709, 1.97815050331519],
+    [6.52717759281799, -6.30816983387575, 8.08379285492595, -9.82240510197603, 12.1358413791395, -5.54349664571295],
+    [5.35500529896124, -3.96415689925446, 8.91990208918795, -12.0338729505790, 9.19494865194302, -2.16866274479712],
+    [1.55225959906681, 0.464621290821181, 8.93237374861479, -11.0321960061126, 6.16780999933360, -0.965458722086812],
+    [1.11999926419994, 0.595748562571649, 9.88952565078920, -10.3255051147040, 4.66861294457414, -0.503243546373828]])
+_AK_BANDS = np.array([0.310559006, 0.776397516, 1.242236025, 1.863354037])
+
+def conductivity(rho, T, cp, cv, mu, drhodP) -> np.ndarray:
+    # IAPWS 2011 with the industrial critical enhancement, as iapws.IAPWS97
+    Tr = np.asarray(T, dtype=float) / TC
+    d = np.asarray(rho, dtype=float) / RHOC
+    k0 = np.sqrt(Tr) / sum(n / Tr**i for i, n in enumerate(_NK0))
+    k1 = np.exp(d * np.sum(_NK1 * (1 / Tr[..., None] - 1)**_IK * (d[..., None] - 1)**_JK, axis=-1))
+    a = _AK[np.searchsorted(_AK_BANDS, d, side="left")]
+    drho_ref = 1 / np.sum(a * d[..., None]**np.arange(6.0), axis=-1) * RHOC / PC
+    dX = np.maximum(d * (PC / RHOC * drhodP - PC / RHOC * drho_ref * 1.5 / Tr), 0.0)
+    y = 0.13 * (dX / 0.06)**(0.63 / 1.239) / 0.4
+    cp_cv = cp / cv
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Z = 2 / np.pi / y * (((1 - 1 / cp_cv) * np.arctan(y) + y / cp_cv) - (1 - np.exp(-1 / (1 / y + y**2 / 3 / d**2))))
+    Z = np.where(y < 1.2e-7, 0.0, Z)
+    k2 = 177.8514 * d * cp / 0.46151805 * Tr / mu * 1e-6 * Z
+    return (k0 * k1 + k2) * 1e-3
+
+def tension(T) -> np.ndarray:
+    tau = 1 - np.asarray(T, dtype=float) / TC
+    return 235.8e-3 * tau**1.256 * (1 - 0.625 * tau)
+
+######################### (P, h) flash #########################
+def _newton_T(region, P, h, T0, max_iter: int = 30) -> np.ndarray:
+    # h(T) at fixed P is monotonic with slope cp
+    T = T0
+    for _ in range(max_iter):
+        r = region(T, P)
+        dT = (r["h"] - h) / r["cp"]
+        T = T - dT
+        if np.all(np.abs(dT) < 1e-10 * T):
+            break
+    return T
+
+def saturation(P, props: Sequence[str] = ("T", "hf", "hg")) -> Dict[str, np.ndarray]:
+    # saturated liquid (f) and vapour (g) at P; available: T, hf, hg, rhof, rhog, muf, mug, sigma
+    P = _check_P(P)
+    T = tsat(P)
+    out: Dict[str, np.ndarray] = {"T": T}
+    f = region1(T, P)
+    g = region2(T, P)
+    out.update(hf=f["h"], hg=g["h"], rhof=1 / f["v"], rhog=1 / g["v"], sigma=tension(T))
+    if "muf" in props:
+        out["muf"] = viscosity(out["rhof"], T)
+    if "mug" in props:
+        out["mug"] = viscosity(out["rhog"], T)
+    return {k: out[k] for k in props}
+
+def props_ph(P, h, props: Sequence[str] = ("T", "rho", "cp", "mu", "k")) -> Dict[str, np.ndarray]:
+    # Only the requested properties are evaluated. Inside the dome (region 4) T and
+    # rho are the mixture values and cp, mu, k are NaN, as iapws leaves them unset.
+    # available: T, rho, cp, mu, k, x, region
+    P, h = np.broadcast_arrays(_check_P(P), np.asarray(h, dtype=float))
+    shape = P.shape
+    P, h = P.ravel(), h.ravel()
+    Ts = tsat(P)
+    f = region1(Ts, P)
+    g = region2(Ts, P)
+    liquid = h <= f["h"]
+    vapour = h >= g["h"]
+    wet = ~(liquid | vapour)
+
+    T = Ts.copy()
+    if liquid.any():
+        T0 = np.maximum(Ts[liquid] - (f["h"][liquid] - h[liquid]) / 4.3, 273.15)
+        T[liquid] = _newton_T(region1, P[liquid], h[liquid], T0)
+    if vapour.any():
+        T0 = Ts[vapour] + (h[vapour] - g["h"][vapour]) / 2.1
+        T[vapour] = _newton_T(region2, P[vapour], h[vapour], T0)
+        if np.any(T[vapour] > T_MAX):
+            raise ValueError(f"IF97 backend covers T <= {T_MAX} K in region 2")
+
+    out: Dict[str, np.ndarray] = {"T": T}
+    x = np.where(liquid, 0.0, np.where(vapour, 1.0, (h - f["h"]) / (g["h"] - f["h"])))
+    if "x" in props:
+        out["x"] = x
+    if "region" in props:
+        out["region"] = np.where(liquid, 1, np.where(vapour, 2, 4))
+    if not set(props) & {"rho", "cp", "mu", "k"}:
+        return {k: out[k].reshape(shape) for k in props}
+
+    st = {key: np.full(P.shape, np.nan) for key in ("v", "cp", "cv", "drhodP")}
+    for mask, region in ((liquid, region1), (vapour, region2)):
+        if mask.any():
+            r = region(T[mask], P[mask])
+            for key in st:
+                st[key][mask] = r[key]
+    st["v"][wet] = f["v"][wet] + x[wet] * (g["v"][wet] - f["v"][wet])
+    rho = 1 / st["v"]
+    out["rho"] = rho
+    out["cp"] = st["cp"]
+    if "mu" in props or "k" in props:
+        mu = np.where(wet, np.nan, viscosity(rho, T))
+        out["mu"] = mu
+        if "k" in props:
+            out["k"] = np.where(wet, np.nan, conductivity(rho, T, st["cp"], st["cv"], mu, st["drhodP"]))
+    return {k: out[k].reshape(shape) for k in props}
+
+def _check_P(P) -> np.ndarray:
+    P = np.asarray(P, dtype=float)
+    if np.any((P < P_MIN) | (P > P_MAX)):
+        raise ValueError(f"IF97 backend covers {P_MIN:.6g} MPa <= P <= {P_MAX:.6g} MPa (regions 1, 2 and 4)")
+    return P
+
+######################### Scalar state #########################
+class State:
+    # Drop-in for the IAPWS97 attributes WaterProps reads (T, h, rho, cp, mu, k,
+    # sigma, x); each is computed on first access only.
+    def __init__(self, P: float, h: float | None = None, x: float | None = None):
+        self.P = P
+        if h is None:
+            sat = saturation(P, ("hf", "hg"))
+            h = float(sat["hf"] + x * (sat["hg"] - sat["hf"]))
+        self.h = h
+        self._x = x
+
+    @cached_property
+    def _props(self) -> Dict[str, float]:
+        if self._x in (0.0, 1.0):       # exactly on the saturation line
+            T = float(tsat(_check_P(self.P)))
+            r = (region1 if self._x == 0.0 else region2)(T, self.P)
+            rho = float(1 / r["v"])
+            mu = float(viscosity(rho, T))
+            k = float(conductivity(rho, T, r["cp"], r["cv"], mu, r["drhodP"]))
+            return {"T": T, "rho": rho, "cp": float(r["cp"]), "mu": mu, "k": k, "x": self._x}
+        out = props_ph(self.P, self.h, ("T", "rho", "cp", "mu", "k", "x"))
+        return {key: float(v) for key, v in out.items()}
+
+    def _get(self, name: str) -> float | None:
+        v = self._props[name]
+        return None if np.isnan(v) else v
+
+    T = property(lambda self: self._get("T"))
+    rho = property(lambda self: self._get("rho"))
+    cp = property(lambda self: self._get("cp"))
+    mu = property(lambda self: self._get("mu"))
+    k = property(lambda self: self._get("k"))
+    x = property(lambda self: self._get("x"))
+
+    @property
+    def sigma(self) -> float | None:
+        # as iapws: liquid, two-phase and saturation-line states only, None for superheated vapour
+        if self._x not in (0.0, 1.0) and self._get("x") == 1.0:
+            return None
+        return float(tension(self.T))
@@ -0,0 +1,125 @@
+from __future__ import annotations
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+import numpy as np
+
+# Append-only on-disk store of axial profiles for many boiler scenarios.
+#   <folder>/profiles.f8    one float64 record per accepted step, fields in COLUMNS (SI units)
+#   <folder>/index.jsonl    one line per scenario: {"name": ..., "stages": [[start, stop], ...]} record offsets
+#   <folder>/.lock          flock held while appending, so pool workers can share a folder
+# Records are written before their index line, so a reader never sees an offset
+# past the data. Reads are zero-copy views of a read-only np.memmap.
+
+COLUMNS = ("x", "dx", "T_gas", "p_gas", "h_water", "Twi", "Two", "qprime", "wall_iterations")
+DTYPE = np.dtype([(c, "f8") for c in COLUMNS])
+
+_STEP_FIELDS = (
+    # column: (step key, unit)
+    ("x", "x", "m"), ("dx", "dx", "m"), ("T_gas", "Tg", "K"), ("p_gas", "pg", "Pa"),
+    ("h_water", "hw", "J/kg"), ("Twi", "Twi", "K"), ("Two", "Two", "K"), ("qprime", "qprime", "W/m"),
+)
+
+def records(steps: Sequence[Dict[str, Any]]) -> np.ndarray:
+    # StageSolver.steps -> structured array with DTYPE
+    out = np.empty(len(steps), dtype=DTYPE)
+    for column, key, unit in _STEP_FIELDS:
+        out[column] = [s[key].to(unit).magnitude for s in steps]
+    out["wall_iterations"] = [s["iterations"] for s in steps]
+    return out
+
+class ProfileStore:
+    def __init__(self, folder: str | Path):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.data_path = self.folder / "profiles.f8"
+        self.index_path = self.folder / "index.jsonl"
+        self._map: np.memmap | None = None
+        self._index: Dict[str, List[Tuple[int, int]]] = {}
+        self._index_size = 0
+
+    def __getstate__(self):
+        return {"folder": self.folder}      # workers reopen the folder, maps are not shipped
+
+    def __setstate__(self, state):
+        self.__init__(state["folder"])
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with open(self.folder / ".lock", "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    ######################### Write #########################
+    def append(self, name: str, stages: Sequence[np.ndarray]) -> None:
+        # stages: one DTYPE array per stage, e.g. [records(s) for s in chain.steps]
+        with self._locked():
+            with open(self.data_path, "ab") as fh:
+                start = fh.tell() // DTYPE.itemsize
+                spans = []
+                for arr in stages:
+                    arr = np.ascontiguousarray(arr, dtype=DTYPE)
+                    fh.write(arr.tobytes())
+                    spans.append([start, start + len(arr)])
+                    start += len(arr)
+                fh.flush()
+                os.fsync(fh.fileno())
+            with open(self.index_path, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps({"name": name, "stages": spans}) + "\n")
+
+    def append_steps(self, name: str, steps: Sequence[Sequence[Dict[str, Any]]]) -> None:
+        self.append(name, [records(s) for s in steps])
+
+    ######################### Read #########################
+    def _refresh(self) -> None:
+        size = self.index_path.stat().st_size if self.index_path.exists() else 0
+        if size == self._index_size:
+            return
+        with open(self.index_path, "r", encoding="utf-8") as fh:
+            fh.seek(self._index_size)
+            chunk = fh.read(size - self._index_size)
+        for line in chunk.splitlines():
+            entry = json.loads(line)
+            self._index[entry["name"]] = [tuple(s) for s in entry["stages"]]   # a re-appended name wins
+        self._index_size = size
+        self._map = None
+
+    def _records(self) -> np.ndarray:
+        if self._map is None:
+            n = self.data_path.stat().st_size // DTYPE.itemsize if self.data_path.exists() else 0
+            self._map = np.memmap(self.data_path, dtype=DTYPE, mode="r", shape=(n,)) if n else np.empty(0, DTYPE)
+        return self._map
+
+    def names(self) -> List[str]:
+        self._refresh()
+        return list(self._index)
+
+    def __len__(self) -> int:
+        return len(self.names())
+
+    def __contains__(self, name: str) -> bool:
+        self._refresh()
+        return name in self._index
+
+    def scenario(self, name: str) -> np.ndarray:
+        # all stages back to back; a view of the memmap
+        self._refresh()
+        spans = self._index[name]
+        return self._records()[spans[0][0]: spans[-1][1]]
+
+    def stage(self, name: str, i: int) -> np.ndarray:
+        # i counts from 0 (HX_1)
+        self._refresh()
+        start, stop = self._index[name][i]
+        return self._records()[start:stop]
+
+    def stages(self, name: str) -> List[np.ndarray]:
+        self._refresh()
+        data = self._records()
+        return [data[start:stop] for start, stop in self._index[name]]
@@ -1,15 +1,69 @@
 from __future__ import annotations
 from common.units import Q_
+from common.instrumentation import report
+from common import tracing
+from common.result_cache import ResultCache, default_cache
 from heat_transfer.config.loader import ConfigLoader
 from heat_transfer.functions.stages_chain import six_stage_counterflow
+from heat_transfer.functions.scenarios import ScenarioRunner
+from heat_transfer.functions.profile_store import ProfileStore
+from heat_transfer.functions import sensitivity
+from heat_transfer.functions.coupling import CombustionBoilerPipeline, case_from_settings
+from thermo.config.schemas import load_settings
 
-def run(stages_path: str, streams_path: str):
+def run(stages_path: str, streams_path: str, cache: ResultCache | None = None):
 
     stages = ConfigLoader.load_stages(stages_path)
     gas_in = ConfigLoader.load_gas_stream(streams_path)
     water_in = ConfigLoader.load_water_stream(streams_path)
 
+    cache = cache if cache is not None else default_cache()     # opt-in, BOILER_RESULT_CACHE
+    if cache is not None:
+        # solver options are defaults in the heat_transfer sources, which are part of the key
+        key = cache.key("boiler", stages, gas_in, water_in, code=("heat_transfer",))
+        result = cache.get(key)
+        if result is not None:
+            return result
+
     solver = six_stage_counterflow(stages=stages)
     result = solver.run(gas=gas_in, water=water_in)
+    report("runner.run")
+    tracing.flush()
 
+    if cache is not None:
+        cache.put(key, result)
     return result
+
+
+def stream(stages_path: str, streams_path: str):
+    # accepted march states one at a time (see six_stage_counterflow.stream)
+    stages = ConfigLoader.load_stages(stages_path)
+    gas_in = ConfigLoader.load_gas_stream(streams_path)
+    water_in = ConfigLoader.load_water_stream(streams_path)
+    yield from six_stage_counterflow(stages=stages).stream(gas=gas_in, water=water_in)
+
+
+def sensitivities(stages_path: str, streams_path: str, params=None):
+    # boiler outlet and its derivatives with respect to params (see sensitivity.outlet)
+    stages = ConfigLoader.load_stages(stages_path)
+    gas_in = ConfigLoader.load_gas_stream(streams_path)
+    water_in = ConfigLoader.load_water_stream(streams_path)
+    return sensitivity.outlet(stages, gas_in, water_in, params=params)
+
+
+def run_scenarios(stages_path: str, streams_path: str, scenarios, processes: int | None = None, profiles: bool = False,
+                  profile_store: ProfileStore | None = None):
+    runner = ScenarioRunner(stages_path, streams_path, processes=processes, profile_store=profile_store)
+    yield from runner.run(scenarios, profiles=profiles)
+
+
+def run_coupled(settings_path: str, stages_path: str, streams_path: str, profiles: bool = False):
+    # combustion result feeds the boiler gas inlet directly; streams.yaml only
+    # supplies the water inlet, furnace pressure and spectroscopic data
+    settings = load_settings(settings_path)
+    stages = ConfigLoader.load_stages(stages_path)
+    gas_tpl = ConfigLoader.load_gas_stream(streams_path)
+    water_in = ConfigLoader.load_water_stream(streams_path)
+
+    pipeline = CombustionBoilerPipeline(settings, stages, gas_tpl, water_in)
+    return pipeline.run(case_from_settings(settings), profiles=profiles)
@@ -0,0 +1,136 @@
+from __future__ import annotations
+import copy
+import csv
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, ClassVar, Dict, Iterable, Iterator, List, Optional, Tuple
+from common.units import Q_
+from heat_transfer.config.loader import ConfigLoader
+from heat_transfer.config.models import Stages, GasStream, WaterStream
+from heat_transfer.functions.fluid_props import GasProps
+from heat_transfer.functions.stages_chain import six_stage_counterflow
+from heat_transfer.functions.continuation import SolutionStore, ContinuationReport
+from heat_transfer.functions.profile_store import ProfileStore
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    gas_mass_flow_rate: Q_ | None = None
+    gas_temperature: Q_ | None = None
+    water_mass_flow_rate: Q_ | None = None
+    drum_pressure: Q_ | None = None
+
+    # table column -> (field, unit); empty cells keep the base stream value
+    COLUMNS: ClassVar[Dict[str, Tuple[str, str]]] = {
+        "gas_mass_flow_rate_kg_s": ("gas_mass_flow_rate", "kg/s"),
+        "gas_temperature_K": ("gas_temperature", "K"),
+        "water_mass_flow_rate_kg_s": ("water_mass_flow_rate", "kg/s"),
+        "drum_pressure_Pa": ("drum_pressure", "Pa"),
+    }
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any], default_name: str = "") -> "Scenario":
+        kwargs = {}
+        for column, (name, unit) in cls.COLUMNS.items():
+            value = row.get(column)
+            if value is None or str(value).strip() == "":
+                continue
+            kwargs[name] = Q_(float(value), unit)
+        return cls(name=str(row.get("name") or default_name), **kwargs)
+
+    def apply(self, gas: GasStream, water: WaterStream) -> Tuple[GasStream, WaterStream]:
+        gas = copy.deepcopy(gas)
+        water = copy.deepcopy(water)
+        if self.gas_mass_flow_rate is not None:
+            gas.mass_flow_rate = self.gas_mass_flow_rate
+        if self.gas_temperature is not None:
+            gas.temperature = self.gas_temperature
+        if self.water_mass_flow_rate is not None:
+            water.mass_flow_rate = self.water_mass_flow_rate
+        if self.drum_pressure is not None:
+            water.pressure = self.drum_pressure
+        return gas, water
+
+@dataclass(frozen=True)
+class ScenarioResult:
+    scenario: Scenario
+    gas_temperature_out: Q_ | None = None
+    gas_pressure_out: Q_ | None = None
+    water_enthalpy_out: Q_ | None = None
+    gas_profile: Optional[List[GasStream]] = None
+    water_profile: Optional[List[WaterStream]] = None
+    continuation: ContinuationReport | None = None
+    regime_changes: Optional[List[Dict[str, Any]]] = None     # six_stage_counterflow.events
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+def load_scenarios(path: str | Path) -> List[Scenario]:
+    path = Path(path)
+    with path.open("r", encoding="utf-8", newline="") as fh:
+        return [Scenario.from_row(row, default_name=f"scenario_{i}") for i, row in enumerate(csv.DictReader(fh))]
+
+######################### Worker #########################
+# Each pool process receives the parsed config once and keeps it, together with
+# the Cantera/IAPWS caches in fluid_props, for every scenario it is handed.
+_WORKER: Dict[str, Any] = {}
+
+def _init_worker(stages: Stages, gas: GasStream, water: WaterStream, warm_start: bool = False,
+                 profile_store: ProfileStore | None = None) -> None:
+    _WORKER["stages"] = stages
+    _WORKER["gas"] = gas
+    _WORKER["water"] = water
+    _WORKER["store"] = SolutionStore() if warm_start else None
+    _WORKER["profiles"] = profile_store
+    GasProps.specific_heat(gas)  # build the Cantera Solution up front
+
+def _solve_scenario(scenario: Scenario, profiles: bool) -> ScenarioResult:
+    gas, water = scenario.apply(_WORKER["gas"], _WORKER["water"])
+    chain = six_stage_counterflow(stages=_WORKER["stages"], store=_WORKER["store"])
+    profile_store = _WORKER["profiles"]
+    try:
+        gas_hist, water_hist = chain.run(gas=gas, water=water, history=profiles and profile_store is None)
+    except Exception as exc:
+        return ScenarioResult(scenario=scenario, error=f"{type(exc).__name__}: {exc}")
+    if profile_store is not None and profiles:
+        profile_store.append_steps(scenario.name, chain.steps)     # written to disk, not returned
+        gas_hist = water_hist = None
+    # gas and water were advanced in place to the boiler outlet
+    return ScenarioResult(
+        scenario=scenario,
+        gas_temperature_out=gas.temperature,
+        gas_pressure_out=gas.pressure,
+        water_enthalpy_out=water.enthalpy,
+        gas_profile=gas_hist if profiles else None,
+        water_profile=water_hist if profiles else None,
+        continuation=chain.report,
+        regime_changes=chain.events,
+    )
+
+class ScenarioRunner:
+    def __init__(self, stages_path: str | Path, streams_path: str | Path, processes: int | None = None,
+                 warm_start: bool = False, profile_store: ProfileStore | None = None):
+        self.stages = ConfigLoader.load_stages(stages_path)
+        self.gas = ConfigLoader.load_gas_stream(streams_path)
+        self.water = ConfigLoader.load_water_stream(streams_path)
+        self.processes = processes
+        self.warm_start = warm_start    # each worker seeds from the scenarios it already solved
+        self.profile_store = profile_store  # profiles=True appends to it instead of returning stream lists
+
+    def run(self, scenarios: Iterable[Scenario], profiles: bool = False) -> Iterator[ScenarioResult]:
+        # processes=0 solves in the calling process, in order
+        if self.processes == 0:
+            _init_worker(self.stages, self.gas, self.water, self.warm_start, self.profile_store)
+            for scenario in scenarios:
+                yield _solve_scenario(scenario, profiles)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker,
+                                 initargs=(self.stages, self.gas, self.water, self.warm_start,
+                                           self.profile_store)) as pool:
+            futures = [pool.submit(_solve_scenario, scenario, profiles) for scenario in scenarios]
+            for fut in as_completed(futures):
+                yield fut.result()
@@ -0,0 +1,210 @@
+from __future__ import annotations
+from dataclasses import replace
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from common.units import Q_
+from common.tracing import span
+from common.sensitivity import Sensitivities
+from heat_transfer.config.models import Stages, GasStream, WaterStream
+from heat_transfer.config.compiled import CompiledStage
+from heat_transfer.functions.stage_solver import StageSolver
+from heat_transfer.functions.stages_chain import six_stage_counterflow
+
+# Forward (tangent-linear) sensitivities of the boiler outlet state y = (T_gas,
+# p_gas, h_water) with respect to inlet conditions and stage geometry, carried
+# along one primal march. On the primal's accepted steps (mesh frozen)
+#     S_{k+1} = S_k + dx_k * (df/dy S_k + df/dp)
+# with df/dy (3 columns) and df/dp (only the parameters that enter the current
+# stage: the two mass flows and that stage's geometry) by forward differences of
+# the march right-hand side. Each difference costs one wall sweep from the
+# primal's converged walls plus a linear correction to the walls' fixed point
+# (see _Rhs) instead of a full wall iteration, and the derivatives are reused over
+# steps where the state barely moves. At a saturation boundary f has a kink (the water temperature flattens at
+# T_sat while boiling, and the film state changes with it) and S gets the jump
+# (f+ - f-) * S_h / f-_h; a stage length enters as f at that stage's outlet.
+#
+# Parameters: INLET names, or "HX_<i>.<field>" with <field> in GEOMETRY.
+
+OUTPUTS = ("gas_temperature", "gas_pressure", "water_enthalpy")
+INLET = ("gas_temperature", "gas_pressure", "gas_mass_flow_rate", "water_enthalpy", "water_mass_flow_rate")
+GEOMETRY = ("inner_length", "inner_diameter", "wall_thickness")
+
+def default_parameters(stages: Stages) -> List[str]:
+    return list(INLET) + [f"HX_{i + 1}.{g}" for i in range(len(tuple(stages))) for g in GEOMETRY]
+
+def _split(name: str, n_stages: int) -> Tuple[int | None, str]:
+    if name in INLET:
+        return None, name
+    stage, _, field = name.partition(".")
+    if stage.startswith("HX_") and stage[3:].isdigit() and 1 <= int(stage[3:]) <= n_stages and field in GEOMETRY:
+        return int(stage[3:]) - 1, field
+    raise ValueError(f"Unknown parameter '{name}' (known: {', '.join(INLET)}, HX_<i>.<{'|'.join(GEOMETRY)}>)")
+
+def _geometry_value(stage, field: str) -> float:
+    hot = stage.hot_side
+    return (hot.wall.thickness if field == "wall_thickness" else getattr(hot, field)).to("m").magnitude
+
+def _perturbed_stage(stage, field: str, value: float):
+    hot = stage.hot_side
+    if field == "wall_thickness":
+        hot = replace(hot, wall=replace(hot.wall, thickness=Q_(value, "m")))
+    else:
+        hot = replace(hot, **{field: Q_(value, "m")})
+    stage = replace(stage, hot_side=hot)
+    return stage, CompiledStage.from_stage(stage)
+
+def _state(gas: GasStream, water: WaterStream) -> List[float]:
+    return [gas.temperature.to("K").magnitude, gas.pressure.to("Pa").magnitude, water.enthalpy.to("J/kg").magnitude]
+
+class _Rhs:
+    # f(y, p) at the solver's current position from one wall sweep (omega = 1) that
+    # starts at the primal's converged walls W: it gives q(W) and W' = G(W). The walls
+    # are then relaxed to their fixed point linearly,
+    #     q* = q + q_W (I - G_W)^-1 (G(W) - W)
+    # with G_W and q_W from linearize() at the unperturbed point. f_T and f_h are
+    # linear in q and f_p does not depend on it. Every call restores the primal state.
+    _GAS = ("temperature", "pressure", "mass_flow_rate", "wall_temperature", "stage")
+    _WATER = ("enthalpy", "mass_flow_rate", "wall_temperature", "q_flux", "stage")
+
+    def __init__(self, solver: StageSolver):
+        self.solver = solver
+
+    def _sweep(self, dy, gas_flow, water_flow, stage, walls) -> Tuple[List[float], float, np.ndarray]:
+        s = self.solver
+        gas, water = s.gas, s.water
+        saved = ({f: getattr(gas, f) for f in self._GAS}, {f: getattr(water, f) for f in self._WATER},
+                 (s.stage, s.geom, s.qprime))
+        try:
+            gas.temperature = gas.temperature + Q_(dy[0], "K")
+            gas.pressure = gas.pressure + Q_(dy[1], "Pa")
+            water.enthalpy = water.enthalpy + Q_(dy[2], "J/kg")
+            gas.mass_flow_rate = gas.mass_flow_rate + Q_(gas_flow, "kg/s")
+            water.mass_flow_rate = water.mass_flow_rate + Q_(water_flow, "kg/s")
+            gas.wall_temperature = gas.wall_temperature + Q_(walls[0], "K")
+            water.wall_temperature = water.wall_temperature + Q_(walls[1], "K")
+            if stage is not None:
+                s.stage, s.geom = stage
+                gas.stage = water.stage = stage[0]
+            # tolerances 0 never stop early: exactly one sweep
+            res = s.iterate_wall_temperature(rtol=0.0, atol_T=Q_(0.0, "K"), atol_q=Q_(0.0, "W/m"),
+                                             max_iter=1, omega=1.0)
+            d = s._rhs()
+            f = [d["dTgdx"].to("K/m").magnitude, d["dpgdx"].to("Pa/m").magnitude, d["dhwdx"].to("J/(kg*m)").magnitude]
+            return f, res["qprime"].to("W/m").magnitude, np.array([res["Twi"].to("K").magnitude,
+                                                                   res["Two"].to("K").magnitude])
+        finally:
+            for f_, v in saved[0].items():
+                setattr(gas, f_, v)
+            for f_, v in saved[1].items():
+                setattr(water, f_, v)
+            s.stage, s.geom, s.qprime = saved[2]
+
+    def linearize(self, rel_step: float) -> List[float]:
+        f0, q0, G0 = self._sweep((0.0, 0.0, 0.0), 0.0, 0.0, None, (0.0, 0.0))
+        W = [self.solver.gas.wall_temperature.to("K").magnitude, self.solver.water.wall_temperature.to("K").magnitude]
+        G_W = np.empty((2, 2))
+        q_W = np.empty(2)
+        for k in range(2):
+            e = rel_step * max(abs(W[k]), 1.0)
+            walls = [0.0, 0.0]
+            walls[k] = e
+            _, q, G = self._sweep((0.0, 0.0, 0.0), 0.0, 0.0, None, walls)
+            G_W[:, k] = (G - G0) / e
+            q_W[k] = (q - q0) / e
+        self.W = np.array(W)
+        self.relax = q_W @ np.linalg.inv(np.eye(2) - G_W)
+        return self._relaxed(f0, q0, G0)
+
+    def _relaxed(self, f: List[float], q: float, G: np.ndarray) -> List[float]:
+        scale = 1.0 + float(self.relax @ (G - self.W)) / q if q != 0.0 else 1.0
+        return [f[0] * scale, f[1], f[2] * scale]
+
+    def __call__(self, dy: Sequence[float] = (0.0, 0.0, 0.0), gas_flow: float = 0.0, water_flow: float = 0.0,
+                 stage=None) -> List[float]:
+        return self._relaxed(*self._sweep(dy, gas_flow, water_flow, stage, (0.0, 0.0)))
+
+def _linearize(rhs: _Rhs, y: List[float], rel_step: float, boundaries: List[float], flows: List[str],
+               variants: Dict[str, tuple], step: Dict[str, float]):
+    # f, df/dy (columns) and df/dp for the parameters that enter this stage
+    f0 = rhs.linearize(rel_step)
+    e_y = [rel_step * max(abs(v), 1.0) for v in y]
+    if any(y[2] < b <= y[2] + e_y[2] for b in boundaries):
+        e_y[2] = -e_y[2]            # difference on the current side of the boundary
+    J = []
+    for k in (0, 2):
+        dy = [0.0, 0.0, 0.0]
+        dy[k] = e_y[k]
+        J.append([(a - b) / e_y[k] for a, b in zip(rhs(dy=dy), f0)])
+    # ideal-gas flue: rho ~ p, while cp, mu, k and Re = G*D/mu do not depend on p,
+    # so p enters f only through the friction term dp/dx ~ 1/rho
+    J.insert(1, [0.0, -f0[1] / y[1], 0.0])
+    dfdp = {}
+    for p in flows:
+        f = rhs(gas_flow=step[p] if p == "gas_mass_flow_rate" else 0.0,
+                water_flow=step[p] if p == "water_mass_flow_rate" else 0.0)
+        dfdp[p] = [(a - b) / step[p] for a, b in zip(f, f0)]
+    for p, variant in variants.items():
+        dfdp[p] = [(a - b) / step[p] for a, b in zip(rhs(stage=variant), f0)]
+    return f0, J, dfdp
+
+def outlet(stages: Stages, gas: GasStream, water: WaterStream, params: Sequence[str] | None = None,
+           rel_step: float = 1e-5, refresh_T: float = 1.0, refresh_h: float = 1e3) -> Sensitivities:
+    # Marches the chain once (gas and water end at the boiler outlet, as after run())
+    # and returns d(outlet)/d(parameter) in SI units per SI unit. The derivatives of f
+    # are re-evaluated at each stage inlet, around saturation boundaries and once the
+    # gas temperature has moved refresh_T [K] or the water enthalpy refresh_h [J/kg]
+    # since the last evaluation; in between, the marches' small steps reuse them.
+    # Refreshing every step (0, 0) is the reference; the defaults stay within ~0.1%
+    # of it, 5 K / 5e3 J/kg costs about half as much at ~1%.
+    chain = six_stage_counterflow(stages=stages)
+    params = list(params) if params is not None else default_parameters(stages)
+    owner = {p: _split(p, len(chain.compiled)) for p in params}
+    stage_list = tuple(chain.stages)
+
+    inlet = {"gas_temperature": gas.temperature.to("K").magnitude, "gas_pressure": gas.pressure.to("Pa").magnitude,
+             "gas_mass_flow_rate": gas.mass_flow_rate.to("kg/s").magnitude,
+             "water_enthalpy": water.enthalpy.to("J/kg").magnitude,
+             "water_mass_flow_rate": water.mass_flow_rate.to("kg/s").magnitude}
+    point = {p: inlet[p] if i is None else _geometry_value(stage_list[i], field) for p, (i, field) in owner.items()}
+    step = {p: rel_step * max(abs(v), 1e-6) for p, v in point.items()}
+    S = {p: [float(p == o) for o in OUTPUTS] for p in params}      # inlet state seeds its own row
+    flows = [p for p in params if p in ("gas_mass_flow_rate", "water_mass_flow_rate")]
+
+    with span("sensitivity.outlet", cat="chain", parameters=len(params)) as sp:
+        evaluations = 0
+        for i, (stage, geom) in enumerate(zip(stage_list, chain.compiled)):
+            gas.stage = stage
+            water.stage = stage
+            solver = StageSolver(stage=stage, gas=gas, water=water, geom=geom)
+            rhs = _Rhs(solver)
+            boundaries = [h for _, h in solver._boundaries()]
+            variants = {p: _perturbed_stage(stage, field, point[p] + step[p])
+                        for p, (j, field) in owner.items() if j == i and field != "inner_length"}
+            lin = at = before_event = None
+            for st in solver.march(stage=f"HX_{i + 1}", keep_steps=False):
+                y = _state(gas, water)
+                if (lin is None or st.event is not None or before_event is not None
+                        or abs(y[0] - at[0]) > refresh_T or abs(y[2] - at[2]) > refresh_h):
+                    lin, at = _linearize(rhs, y, rel_step, boundaries, flows, variants, step), y
+                    evaluations += 1
+                f0, J, dfdp = lin
+                if before_event is not None and before_event[2] != 0.0:
+                    # kink in f at a saturation boundary
+                    for p in params:
+                        S[p] = [s + (a - b) * S[p][2] / before_event[2] for s, a, b in zip(S[p], f0, before_event)]
+                before_event = f0 if st.event is not None else None
+
+                dx = st.dx.to("m").magnitude
+                for p in params:
+                    d = dfdp.get(p, (0.0, 0.0, 0.0))
+                    S[p] = [S[p][r] + dx * (sum(J[k][r] * S[p][k] for k in range(3)) + d[r]) for r in range(3)]
+            lengths = [p for p, (j, field) in owner.items() if j == i and field == "inner_length"]
+            if lengths:
+                f_out = rhs.linearize(rel_step)
+                for p in lengths:
+                    S[p] = [s + a for s, a in zip(S[p], f_out)]
+        sp.set(linearizations=evaluations)
+
+    out = dict(zip(OUTPUTS, _state(gas, water)))
+    jac = {o: {p: S[p][k] for p in params} for k, o in enumerate(OUTPUTS)}
+    return Sensitivities(point=point, outputs=out, jacobian=jac)
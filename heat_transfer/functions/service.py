@@ -0,0 +1,290 @@
+from __future__ import annotations
+import asyncio
+import json
+import multiprocessing
+import os
+from math import inf
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import monotonic, perf_counter
+from typing import Any, Dict, List, Set, Tuple
+from common.units import Q_
+from heat_transfer.config.loader import ConfigLoader
+from heat_transfer.functions.continuation import OperatingPoint
+from heat_transfer.functions.coupling import case_from_settings
+from heat_transfer.functions.scenarios import Scenario, _WORKER, _init_worker, _solve_scenario
+from thermo.config.schemas import load_settings
+from thermo.services.combustor import build_combustor
+
+# Long-lived solver service. Worker processes load settings, stages and streams
+# once and keep the CoolProp / Cantera / IAPWS caches warm; concurrent requests of
+# one kind are gathered for a short window and sent to a worker as one batch.
+#
+#   POST /combustion  {"fuel_mass_flow_kg_s": .., "air_T_K": .., "excess_air_ratio": ..}
+#   POST /boiler      {"gas_mass_flow_rate_kg_s": .., "gas_temperature_K": .., "water_mass_flow_rate_kg_s": .., "drum_pressure_Pa": ..}
+#   GET  /metrics     latency percentiles, queue depth, batch sizes
+#   GET  /health
+# Omitted fields keep the bundled settings.toml / streams.yaml values.
+# warm_start=True seeds each boiler solve from the nearest operating point the
+# worker has already solved: faster, but a result then depends (within the march
+# tolerances) on what that worker solved before. Off by default.
+
+KINDS = ("combustion", "boiler")
+
+######################### Worker #########################
+_SERVICE: Dict[str, Any] = {}
+
+def _init_service_worker(settings_path: str, stages_path: str, streams_path: str, warm_start: bool,
+                         ready: Any = None) -> None:
+    settings = load_settings(settings_path)
+    _SERVICE["settings"] = settings
+    _SERVICE["combustor"] = build_combustor(settings)
+    _init_worker(ConfigLoader.load_stages(stages_path), ConfigLoader.load_gas_stream(streams_path),
+                 ConfigLoader.load_water_stream(streams_path), warm_start)
+    # one bundled combustion solve fills the CoolProp states before the first request
+    _SERVICE["combustor"].run(case_from_settings(settings))
+    _SERVICE["ready"] = ready
+
+def _ping() -> int:
+    # held until every worker holds one ping, so the start-up pings reach each
+    # worker (and its warm-up) instead of one warm worker answering several
+    if _SERVICE.get("ready") is not None:
+        _SERVICE["ready"].wait()
+    return os.getpid()
+
+def _combustion(payload: Dict[str, Any]) -> Dict[str, Any]:
+    s = _SERVICE["settings"]
+    fuel = payload.get("fuel_mass_flow_kg_s")
+    air_T = payload.get("air_T_K")
+    case = case_from_settings(s,
+                              fuel_mass_flow=Q_(float(fuel), "kg/s") if fuel is not None else None,
+                              air_T=Q_(float(air_T), "K") if air_T is not None else None,
+                              excess_air_ratio=payload.get("excess_air_ratio"))
+    res = _SERVICE["combustor"].run(case)
+    return {
+        "T_ad_K": res.T_ad_K.to("K").magnitude,
+        "Q_in_kW": res.Q_in_total_kW.to("kW").magnitude,
+        "power_LHV_kW": res.power_LHV_kW.to("kW").magnitude,
+        "flue_mass_flow_kg_s": res.flue_mass_flow_kg_s.to("kg/s").magnitude,
+        "flue_x": {k: float(getattr(v, "magnitude", v)) for k, v in res.flue_x.items()},
+    }
+
+def _boiler(payload: Dict[str, Any]) -> Dict[str, Any]:
+    r = _solve_scenario(Scenario.from_row(payload, default_name="request"), False)
+    if not r.ok:
+        raise RuntimeError(r.error)
+    return {
+        "gas_temperature_out_K": r.gas_temperature_out.to("K").magnitude,
+        "gas_pressure_out_Pa": r.gas_pressure_out.to("Pa").magnitude,
+        "water_enthalpy_out_J_kg": r.water_enthalpy_out.to("J/kg").magnitude,
+    }
+
+def _boiler_key(payload: Dict[str, Any]) -> Tuple[float, ...]:
+    try:
+        gas, water = Scenario.from_row(payload).apply(_WORKER["gas"], _WORKER["water"])
+    except (TypeError, ValueError):
+        return (inf,)           # malformed; fails on its own in _boiler
+    return OperatingPoint.from_streams(gas, water).as_tuple()
+
+def _solve_batch(kind: str, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # boiler batches are solved in operating-point order so the warm-start store (if on)
+    # seeds each request from its neighbour
+    order = list(range(len(payloads)))
+    if kind == "boiler":
+        order.sort(key=lambda i: _boiler_key(payloads[i]))
+    solve = _combustion if kind == "combustion" else _boiler
+    out: List[Dict[str, Any]] = [{} for _ in payloads]
+    for i in order:
+        try:
+            out[i] = {"ok": True, "result": solve(payloads[i])}
+        except Exception as exc:
+            out[i] = {"ok": False, "error": " ".join(f"{type(exc).__name__}: {exc}".split())}
+    return out
+
+######################### Metrics #########################
+
+@dataclass
+class Metrics:
+    window: int = 1024                                          # latencies kept per kind
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: {k: [] for k in KINDS})
+    requests: Dict[str, int] = field(default_factory=lambda: {k: 0 for k in KINDS})
+    errors: Dict[str, int] = field(default_factory=lambda: {k: 0 for k in KINDS})
+    batches: Dict[str, int] = field(default_factory=lambda: {k: 0 for k in KINDS})
+    batched_requests: Dict[str, int] = field(default_factory=lambda: {k: 0 for k in KINDS})
+    max_queue_depth: Dict[str, int] = field(default_factory=lambda: {k: 0 for k in KINDS})
+    started: float = field(default_factory=monotonic)
+
+    def observe(self, kind: str, seconds: float, ok: bool) -> None:
+        lat = self.latencies[kind]
+        lat.append(seconds)
+        if len(lat) > self.window:
+            del lat[: len(lat) - self.window]
+        self.requests[kind] += 1
+        if not ok:
+            self.errors[kind] += 1
+
+    @staticmethod
+    def _percentile(values: List[float], q: float) -> float | None:
+        if not values:
+            return None
+        s = sorted(values)
+        return s[min(len(s) - 1, int(round(q * (len(s) - 1))))]
+
+    def snapshot(self, queue_depth: Dict[str, int], in_flight: int) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"uptime_s": monotonic() - self.started, "in_flight_batches": in_flight}
+        for k in KINDS:
+            lat = self.latencies[k]
+            out[k] = {
+                "requests": self.requests[k],
+                "errors": self.errors[k],
+                "queue_depth": queue_depth[k],
+                "max_queue_depth": self.max_queue_depth[k],
+                "batches": self.batches[k],
+                "mean_batch_size": self.batched_requests[k] / self.batches[k] if self.batches[k] else None,
+                "latency_s": {"p50": self._percentile(lat, 0.50), "p90": self._percentile(lat, 0.90),
+                              "p99": self._percentile(lat, 0.99), "max": max(lat) if lat else None},
+            }
+        return out
+
+######################### Server #########################
+
+class SolverService:
+    def __init__(self, settings_path: str | Path, stages_path: str | Path, streams_path: str | Path,
+                 processes: int | None = None, batch_window: float = 0.005, max_batch: int = 16,
+                 warm_start: bool = False):
+        self.paths = (str(settings_path), str(stages_path), str(streams_path))
+        self.processes = processes or os.cpu_count() or 1
+        self.batch_window = batch_window        # seconds to wait for more requests after the first
+        self.max_batch = max_batch
+        self.warm_start = warm_start            # see the note at the top of this module
+        self.metrics = Metrics()
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._slots: asyncio.Semaphore | None = None
+        self._pool: ProcessPoolExecutor | None = None
+        self._tasks: List[asyncio.Task] = []
+        self._batches: Set[asyncio.Task] = set()    # running _run_batch tasks; the loop keeps only weak refs
+        self._in_flight = 0
+
+    async def start(self) -> None:
+        ctx = multiprocessing.get_context()
+        ready = ctx.Barrier(self.processes)
+        self._pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=ctx, initializer=_init_service_worker,
+                                         initargs=(*self.paths, self.warm_start, ready))
+        self._slots = asyncio.Semaphore(self.processes)     # one batch per worker at a time
+        self._queues = {k: asyncio.Queue() for k in KINDS}
+        self._tasks = [asyncio.create_task(self._dispatch(k)) for k in KINDS]
+        # the pool may spawn lazily; one ping per worker, released together, starts
+        # every worker (and its warm-up) before serving
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _ping) for _ in range(self.processes)))
+
+    async def close(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await asyncio.gather(*self._batches, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+    async def submit(self, kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        fut = asyncio.get_running_loop().create_future()
+        q = self._queues[kind]
+        await q.put((payload, fut, perf_counter()))
+        self.metrics.max_queue_depth[kind] = max(self.metrics.max_queue_depth[kind], q.qsize())
+        return await fut
+
+    async def _dispatch(self, kind: str) -> None:
+        q = self._queues[kind]
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await q.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(q.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._slots.acquire()
+            task = asyncio.create_task(self._run_batch(kind, batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, kind: str, batch: List[Tuple[Dict[str, Any], asyncio.Future, float]]) -> None:
+        self._in_flight += 1
+        self.metrics.batches[kind] += 1
+        self.metrics.batched_requests[kind] += len(batch)
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self._pool, _solve_batch, kind, [payload for payload, _, _ in batch])
+        except Exception as exc:         # worker died / pool broken
+            results = [{"ok": False, "error": f"{type(exc).__name__}: {exc}"}] * len(batch)
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+        now = perf_counter()
+        for (_, fut, t0), res in zip(batch, results):
+            self.metrics.observe(kind, now - t0, res["ok"])
+            if not fut.done():
+                fut.set_result(res)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self.metrics.snapshot({k: q.qsize() for k, q in self._queues.items()}, self._in_flight)
+
+    ######################### HTTP #########################
+    # Minimal HTTP/1.1 over TCP or a Unix socket, JSON bodies, one request per connection.
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            status, body = await self._route(reader)
+        except Exception as exc:
+            status, body = 400, {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+        data = json.dumps(body).encode()
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}.get(status, "Error")
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _route(self, reader: asyncio.StreamReader) -> Tuple[int, Any]:
+        method, path, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+        length = 0
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        payload = json.loads(await reader.readexactly(length)) if length else {}
+        path = path.split("?", 1)[0].rstrip("/")
+        if path == "/health":
+            return 200, {"ok": True}
+        if path == "/metrics":
+            return 200, self.snapshot()
+        kind = path.lstrip("/")
+        if kind not in KINDS:
+            return 404, {"ok": False, "error": f"unknown endpoint {path}"}
+        if method != "POST":
+            return 405, {"ok": False, "error": "use POST"}
+        if not isinstance(payload, dict):
+            return 400, {"ok": False, "error": "request body must be a JSON object"}
+        res = await self.submit(kind, payload)
+        return (200 if res["ok"] else 400), res
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765, unix_socket: str | None = None) -> None:
+        await self.start()
+        if unix_socket:
+            server = await asyncio.start_unix_server(self._handle, path=unix_socket)
+        else:
+            server = await asyncio.start_server(self._handle, host=host, port=port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.close()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+import copy
+import dataclasses
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from common.result_cache import canonical, code_digest
+from heat_transfer.config.models import FirePass, SmokePass, Reversal, Economiser, GasStream, WaterStream
+
+# In-memory memo of solved stages, so scenarios that share upstream geometry and
+# inlet conditions solve that prefix once. The key hashes the stage geometry, the
+# exact inlet gas and water states (every stream field but the stage, including
+# the wall temperatures the wall iteration starts from) and the heat_transfer
+# sources; a chain resumes marching at the first stage without an entry.
+# Warm-start seeds are not part of the key: a hit returns whichever solve stored it.
+
+@dataclass(frozen=True)
+class StageOutcome:
+    gas: Dict[str, Any]                 # outlet stream fields, stage excluded
+    water: Dict[str, Any]
+    steps: List[Dict[str, Any]]         # StageSolver.steps
+    events: List[Dict[str, Any]]
+    wall_iterations: int
+    gas_history: Optional[List[GasStream]] = None       # only with StageMemo(profiles=True)
+    water_history: Optional[List[WaterStream]] = None
+
+def _fields(stream: GasStream | WaterStream) -> Dict[str, Any]:
+    return {f.name: copy.deepcopy(getattr(stream, f.name)) for f in dataclasses.fields(stream) if f.name != "stage"}
+
+class StageMemo:
+    def __init__(self, max_entries: int = 256, profiles: bool = False):
+        self.max_entries = max_entries
+        self.profiles = profiles        # also keep the per-step stream copies run(history=True) returns
+        self._entries: "OrderedDict[str, StageOutcome]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, stage: FirePass | SmokePass | Reversal | Economiser, gas: GasStream, water: WaterStream) -> str:
+        payload = json.dumps([code_digest("heat_transfer"), canonical(stage), canonical(_fields(gas)),
+                              canonical(_fields(water))], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str, history: bool = False) -> StageOutcome | None:
+        # history=True only hits entries that kept their stream copies
+        entry = self._entries.get(key)
+        if entry is None or (history and entry.gas_history is None):
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry
+
+    def put(self, key: str, gas: GasStream, water: WaterStream, steps: List[Dict[str, Any]],
+            events: List[Dict[str, Any]], wall_iterations: int, gas_history: Optional[List[GasStream]] = None,
+            water_history: Optional[List[WaterStream]] = None) -> None:
+        keep = self.profiles and gas_history is not None
+        self._entries[key] = StageOutcome(gas=_fields(gas), water=_fields(water), steps=list(steps),
+                                          events=list(events), wall_iterations=wall_iterations,
+                                          gas_history=list(gas_history) if keep else None,
+                                          water_history=list(water_history) if keep else None)
+        self._entries.move_to_end(key)
+        self.stats["stores"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    @staticmethod
+    def restore(outcome: StageOutcome, gas: GasStream, water: WaterStream) -> None:
+        # advance gas and water in place to the stored outlet, as a solve would
+        for name, value in outcome.gas.items():
+            setattr(gas, name, copy.deepcopy(value))
+        for name, value in outcome.water.items():
+            setattr(water, name, copy.deepcopy(value))
+
+    def info(self) -> Dict[str, Any]:
+        looked_up = self.stats["hits"] + self.stats["misses"]
+        return {**self.stats, "entries": len(self._entries), "max_entries": self.max_entries,
+                "hit_rate": self.stats["hits"] / looked_up if looked_up else 0.0}
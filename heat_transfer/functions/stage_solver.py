@@ -1,21 +1,50 @@
-from typing import Callable, Dict, List, Any, Optional
+from dataclasses import dataclass
+from math import copysign
+from typing import Callable, Dict, Iterator, List, Any, Optional, Tuple
 from heat_transfer.functions.heat_rate import HeatRate
 from heat_transfer.config.models import FirePass, SmokePass, Reversal, Economiser, GasStream, WaterStream
-from math import pi, log
+from heat_transfer.config.compiled import CompiledStage
 import copy
 from common.units import ureg, Q_
+from common.instrumentation import scope
+from common.tracing import TRACER, span
+from heat_transfer.functions.htc_water import WaterHTC
+
+_m = ureg.meter
+_m2 = ureg.meter**2
+_R = ureg.meter * ureg.kelvin / ureg.watt
+
+@dataclass(frozen=True)
+class MarchState:
+    # one accepted step: state at x, before the step of length dx is taken
+    stage: str
+    x: Q_
+    dx: Q_
+    wall_iterations: int
+    gas_temperature: Q_
+    gas_pressure: Q_
+    water_enthalpy: Q_
+    Twi: Q_
+    Two: Q_
+    qprime: Q_
+    event: str | None = None        # boundary this step lands on, see StageSolver._event_step
 
 class StageSolver:
 
-    def __init__(self, stage: FirePass | SmokePass | Reversal | Economiser, gas: GasStream, water: WaterStream):
+    def __init__(self, stage: FirePass | SmokePass | Reversal | Economiser, gas: GasStream, water: WaterStream, seed: Any = None, geom: CompiledStage | None = None):
         self.stage = stage
+        self.geom = geom if geom is not None else CompiledStage.from_stage(stage)
         self.gas = gas
         self.water = water
         self.qprime = None
+        self.seed = seed                  # StageSeed from a nearby solved operating point
+        self.steps: List[Dict[str, Any]] = []
+        self.events: List[Dict[str, Any]] = []     # regime changes: x, boundary, from, to
+        self.wall_iterations = 0
 
     def update_walls(self, qprime):
-            Twi = self.gas.temperature - ( qprime / (self.gas.htc * self.stage.hot_side.inner_perimeter) )
-            Two = Twi - qprime / (2 * pi * self.stage.hot_side.wall.conductivity) * log(self.stage.hot_side.outer_diameter / self.stage.hot_side.inner_diameter)
+            Twi = self.gas.temperature - ( qprime / (self.gas.htc * Q_(self.geom.inner_perimeter, _m)) )
+            Two = Twi - qprime * Q_(self.geom.R_wall, _R)
             return {"Twi": Twi, "Two": Two}
 
     def iterate_wall_temperature(self, *, guess: Optional[Q_] = None, rtol: float = 1e-4, atol_T: Q_ = (1e-3 * ureg.kelvin), atol_q: Q_ = (1e-3 * ureg.watt/ureg.meter), max_iter: int = 50, omega: float = 0.5,) -> Dict[str, Any]:
@@ -38,10 +67,10 @@ class StageSolver:
             self.gas.wall_temperature = Twi
             self.water.wall_temperature = Two
             self.qprime = qprime
-            qprime_new = HeatRate(self.stage, self.gas, self.water).heat_rate_per_length()
+            qprime_new = HeatRate(self.stage, self.gas, self.water, geom=self.geom).heat_rate_per_length()
             
-            Twi_new = self.gas.temperature - qprime_new / (self.gas.htc * self.stage.hot_side.inner_perimeter)
-            Two_new = Twi_new - qprime_new * self.stage.hot_side.wall.thickness / (self.stage.hot_side.wall.conductivity * self.stage.hot_side.outer_perimeter)
+            Twi_new = self.gas.temperature - qprime_new / (self.gas.htc * Q_(self.geom.inner_perimeter, _m))
+            Two_new = Twi_new - qprime_new * Q_(self.geom.wall_thickness / (self.geom.wall_conductivity * self.geom.outer_perimeter), _R)
 
             conv_Twi = abs(Twi_new - Twi) <= max(atol_T, rtol * max(abs(Twi_new), (1.0 * ureg.kelvin)))
             conv_qprime = (qprime is not None) and (
@@ -51,6 +80,12 @@ class StageSolver:
                 abs(Two_new - Two) <= max(atol_T, rtol * max(abs(Two_new), (1.0 * ureg.kelvin)))
             )            
 
+            if TRACER.enabled:
+                TRACER.instant("wall_iteration", "wall", k=k, Twi=Twi_new,
+                               dTwi=abs(Twi_new - Twi).to("K").magnitude,
+                               dTwo=abs(Two_new - Two).to("K").magnitude if Two is not None else None,
+                               dqprime=abs(qprime_new - qprime).to("W/m").magnitude if qprime is not None else None)
+
             if conv_Twi and conv_qprime and (conv_Two or Two_new is None):
                 self.gas.wall_temperature = Twi_new
                 self.water.wall_temperature = Two_new
@@ -85,36 +120,126 @@ class StageSolver:
 
         dTgdx = - self.qprime / (self.gas.mass_flow_rate * self.gas.specific_heat)
         dhwdx = + self.qprime / self.water.mass_flow_rate
-        dpgdx = - self.gas.friction_factor * self.gas.mass_flow_rate**2 / (2.0 * self.stage.hot_side.hydraulic_diameter * self.stage.hot_side.flow_area**2 * self.gas.density)
+        dpgdx = - self.gas.friction_factor * self.gas.mass_flow_rate**2 / (2.0 * Q_(self.geom.hydraulic_diameter * self.geom.flow_area**2, _m * _m2**2) * self.gas.density)
 
         return {"dTgdx": dTgdx, "dhwdx": dhwdx, "dpgdx": dpgdx}
 
-    def solve(self, dx_init: Q_ = (0.01 * ureg.meter), tol_T: Q_ = (2.0 * ureg.kelvin)):
+    def _apply_seed(self, x: Q_, x_prev: Q_ | None) -> Q_:
+        # First position takes the stored walls outright; later positions keep this
+        # solve's converged walls and add the stored solution's change along x.
+        s = self.seed.at(x)
+        if x_prev is None or self.qprime is None:
+            self.gas.wall_temperature = s["Twi"]
+            self.water.wall_temperature = s["Two"]
+            self.qprime = s["qprime"]
+        else:
+            p = self.seed.at(x_prev)
+            self.gas.wall_temperature = self.gas.wall_temperature + (s["Twi"] - p["Twi"])
+            self.water.wall_temperature = self.water.wall_temperature + (s["Two"] - p["Two"])
+            self.qprime = self.qprime + (s["qprime"] - p["qprime"])
+        return s["dx"]
+
+    def solve(self, dx_init: Q_ = (0.01 * ureg.meter), tol_T: Q_ = (2.0 * ureg.kelvin), history: bool = True):
+        # history=False skips the per-step stream copies; self.steps still holds the profile
+        gas_list: List[GasStream] = []
+        water_list: List[WaterStream] = []
+        for _ in self.march(dx_init, tol_T, history=(gas_list, water_list) if history else None):
+            pass
+        return gas_list, water_list
+
+    def _boundaries(self) -> List[Tuple[str, float]]:
+        # water enthalpies (J/kg) where WaterHTC.regime switches; the drum pressure is fixed along the march
+        h_f = self.water.liquid_saturation_enthalpy
+        return [("saturated_liquid", h_f.to("J/kg").magnitude),
+                ("saturated_vapour", (h_f + self.water.latent_heat_of_vaporization).to("J/kg").magnitude)]
+
+    def _event_step(self, dhwdx: Q_, dx: Q_, boundaries: List[Tuple[str, float]]) -> Tuple[Q_, Tuple[str, float] | None]:
+        # The water enthalpy is linear over an explicit step, so the first boundary it
+        # crosses is located exactly; the step is cut to end on it.
+        h = self.water.enthalpy.to("J/kg").magnitude
+        rate = dhwdx.to("J/kg/m").magnitude
+        step = dx.to("m").magnitude
+        hit = None
+        for name, target in boundaries:
+            s = (target - h) / rate if rate != 0.0 else -1.0
+            if 0.0 < s < step:
+                step, hit = s, (name, target)
+        return (Q_(step, _m), hit) if hit is not None else (dx, None)
+
+    def march(self, dx_init: Q_ = (0.01 * ureg.meter), tol_T: Q_ = (2.0 * ureg.kelvin), stage: str | None = None,
+              history: Tuple[list, list] | None = None, keep_steps: bool = True,
+              events: bool = True) -> Iterator[MarchState]:
+        # Yields each accepted step as it is taken; gas and water advance in place after
+        # the yield. keep_steps=False leaves self.steps empty, so memory stays constant.
+        # events=True lands a step exactly on each saturation boundary the water enthalpy
+        # crosses, so no step straddles the kink in the water temperature (flat at T_sat
+        # while boiling) and in the film state.
+        stage = stage or self.geom.zone
+        boundaries = self._boundaries() if events else []
         dx = dx_init
-        gas_list = []
-        water_list = []
         x = 0.0 * ureg.meter
-        while x < self.stage.hot_side.inner_length:
-            res = self.iterate_wall_temperature()
-            if not res["converged"]:
-                raise RuntimeError("Wall iteration failed")
-
-            gas_list.append(copy.deepcopy(self.gas))
-            water_list.append(copy.deepcopy(self.water))
-
-            derivs = self._rhs()
-
-            dT_est = abs(derivs["dTgdx"]) * dx
-            if dT_est > tol_T:      # too large, cut step
-                dx *= 0.5
-                continue
-            if dT_est < 0.25 * tol_T:  # safe, enlarge step
-                dx *= 1.2
-
-            self.gas.temperature += derivs["dTgdx"] * dx
-            self.gas.pressure    += derivs["dpgdx"] * dx
-            self.water.enthalpy  += derivs["dhwdx"] * dx
-
-            x += dx
-
-        return gas_list, water_list
\ No newline at end of file
+        x_prev = None
+        L = Q_(self.geom.inner_length, _m)
+        rejected = 0
+        accepted = 0
+        with span("StageSolver.solve", cat="stage", zone=self.geom.zone, length=L) as stage_span:
+            while x < L:
+                if self.seed is not None and (x_prev is None or x_prev != x):   # once per position, not on retries
+                    dx = self._apply_seed(x, x_prev)
+                    x_prev = x
+                with scope(phase="wall_iteration"), span("iterate_wall_temperature", cat="wall", x=x) as sp:
+                    res = self.iterate_wall_temperature()
+                    sp.set(converged=res["converged"], iterations=res["iterations"])
+                self.wall_iterations += res["iterations"]
+                if not res["converged"]:
+                    raise RuntimeError("Wall iteration failed")
+
+                if history is not None:
+                    with scope(phase="history"):
+                        history[0].append(copy.deepcopy(self.gas))
+                        history[1].append(copy.deepcopy(self.water))
+
+                with scope(phase="rhs"):
+                    derivs = self._rhs()
+
+                dT_est = abs(derivs["dTgdx"]) * dx
+                if dT_est > tol_T:      # too large, cut step
+                    TRACER.instant("step", "march", x=x, dx=dx, accepted=False, wall_iterations=res["iterations"],
+                                   dT_est=dT_est)
+                    rejected += 1
+                    dx *= 0.5
+                    continue
+                if dT_est < 0.25 * tol_T:  # safe, enlarge step
+                    dx *= 1.2
+
+                accepted += 1
+                step, hit = self._event_step(derivs["dhwdx"], dx, boundaries) if boundaries else (dx, None)
+                if keep_steps:
+                    self.steps.append({"x": x, "dx": step, "iterations": res["iterations"],
+                                       "Twi": res["Twi"], "Two": res["Two"], "qprime": res["qprime"],
+                                       "Tg": self.gas.temperature, "pg": self.gas.pressure, "hw": self.water.enthalpy})
+                if TRACER.enabled:
+                    TRACER.instant("step", "march", x=x, dx=step, accepted=True, wall_iterations=res["iterations"],
+                                   dT_est=dT_est, Tg=self.gas.temperature, hw=self.water.enthalpy,
+                                   regime=WaterHTC.regime(self.water))
+
+                yield MarchState(stage=stage, x=x, dx=step, wall_iterations=res["iterations"],
+                                 gas_temperature=self.gas.temperature, gas_pressure=self.gas.pressure,
+                                 water_enthalpy=self.water.enthalpy, Twi=res["Twi"], Two=res["Two"],
+                                 qprime=res["qprime"], event=hit[0] if hit is not None else None)
+
+                regime = WaterHTC.regime(self.water) if hit is not None else None
+                self.gas.temperature += derivs["dTgdx"] * step
+                self.gas.pressure    += derivs["dpgdx"] * step
+                self.water.enthalpy  += derivs["dhwdx"] * step
+
+                x += step
+                if hit is not None:
+                    # just past the boundary, so the next step starts inside the new regime
+                    # (on it, quality_from_h would give None); the offset is ~1e-3 J/kg
+                    self.water.enthalpy = Q_(hit[1] + copysign(1e-9 * abs(hit[1]), derivs["dhwdx"].magnitude), "J/kg")
+                    event = {"x": x, "boundary": hit[0], "from": regime, "to": WaterHTC.regime(self.water)}
+                    self.events.append(event)
+                    TRACER.instant("regime_change", "march", **event)
+
+            stage_span.set(steps=accepted, rejected=rejected, wall_iterations=self.wall_iterations)
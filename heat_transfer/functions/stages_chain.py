@@ -1,24 +1,88 @@
 import copy
-from typing import List, Tuple
+from typing import Any, Dict, Iterator, List, Tuple
 from heat_transfer.config.models import Stages, GasStream, WaterStream
-from heat_transfer.functions.stage_solver import StageSolver
+from heat_transfer.functions.stage_solver import StageSolver, MarchState
+from heat_transfer.config.compiled import compile_stages
+from common.instrumentation import scope
+from common.tracing import span
+from heat_transfer.functions.continuation import (SolutionStore, StoredSolution, StageSeed, OperatingPoint,
+                                                  ContinuationReport)
+from heat_transfer.functions.stage_memo import StageMemo
 
 class six_stage_counterflow:
-    def __init__(self, stages: Stages):
+    def __init__(self, stages: Stages, store: SolutionStore | None = None, memo: StageMemo | None = None):
         self.stages = stages
+        self.compiled = compile_stages(stages)     # float geometry + constant resistances per stage
+        self.store = store          # optional warm-start store shared across runs
+        self.memo = memo            # optional solved-stage memo shared across runs (see stage_memo)
+        self.reused: List[bool] = []                    # per stage of the last run: taken from the memo
+        self.report: ContinuationReport | None = None
+        self.steps: List[List[Dict[str, Any]]] = []     # accepted steps of the last run, per stage
+        self.events: List[Dict[str, Any]] = []          # regime changes of the last run, with their stage
 
-    def run(self, gas: GasStream, water: WaterStream) -> Tuple[List[GasStream], List[WaterStream]]:
+    def run(self, gas: GasStream, water: WaterStream, history: bool = True) -> Tuple[List[GasStream], List[WaterStream]]:
+        # history=False returns empty lists and keeps only self.steps (see profile_store)
         gas_hist: List[GasStream] = []
         water_hist: List[WaterStream] = []
 
-        for stage in self.stages:
+        point = OperatingPoint.from_streams(gas, water)
+        nearest = self.store.nearest(point) if self.store is not None else None
+        seeds: List[StageSeed] = []
+        iterations: List[int] = []
+        self.steps = []
+        self.events = []
+        self.reused = []
+
+        for i, (stage, geom) in enumerate(zip(self.stages, self.compiled)):
+            key = self.memo.key(stage, gas, water) if self.memo is not None else None
+            hit = self.memo.get(key, history=history) if self.memo is not None else None
             gas.stage = stage
             water.stage = stage
-            solver = StageSolver(stage=stage, gas=gas, water=water)
-            g_list, w_list = solver.solve()  # uses your earlier solve() that returns lists of instances
-            gas_hist.extend(copy.deepcopy(g_list))
-            water_hist.extend(copy.deepcopy(w_list))
+            self.reused.append(hit is not None)
+            if hit is not None:
+                with span(f"HX_{i + 1}", cat="chain", reused=True):
+                    StageMemo.restore(hit, gas, water)
+                if history:
+                    gas_hist.extend(copy.deepcopy(hit.gas_history))
+                    water_hist.extend(copy.deepcopy(hit.water_history))
+                self.steps.append(hit.steps)
+                self.events.extend({"stage": f"HX_{i + 1}", **e} for e in hit.events)
+                seeds.append(StageSeed.from_steps(hit.steps))
+                iterations.append(hit.wall_iterations)
+                continue
+            seed = nearest.seeds[i] if nearest is not None and len(nearest.seeds[i].x) else None
+            solver = StageSolver(stage=stage, gas=gas, water=water, seed=seed, geom=geom)
+            with scope(stage=f"HX_{i + 1}"), span(f"HX_{i + 1}", cat="chain", warm=seed is not None):
+                g_list, w_list = solver.solve(history=history)  # uses your earlier solve() that returns lists of instances
+                if history:
+                    with scope(phase="history"):
+                        gas_hist.extend(copy.deepcopy(g_list))
+                        water_hist.extend(copy.deepcopy(w_list))
             # gas and water are already updated in-place to stage outlet; they feed the next stage
+            self.steps.append(solver.steps)
+            self.events.extend({"stage": f"HX_{i + 1}", **e} for e in solver.events)
+            seeds.append(StageSeed.from_steps(solver.steps))
+            iterations.append(solver.wall_iterations)
+            if self.memo is not None:
+                self.memo.put(key, gas, water, solver.steps, solver.events, solver.wall_iterations,
+                              g_list if history else None, w_list if history else None)
+
+        if self.store is not None:
+            reference = nearest.reference_iterations if nearest is not None else iterations
+            self.store.add(StoredSolution(point=point, seeds=seeds, wall_iterations=iterations,
+                                          reference_iterations=reference))
+            self.report = ContinuationReport(point=point, seeded_from=nearest.point if nearest is not None else None,
+                                             wall_iterations=iterations, reference_iterations=reference)
 
         return gas_hist, water_hist
- 
\ No newline at end of file
+
+    def stream(self, gas: GasStream, water: WaterStream) -> Iterator[MarchState]:
+        # Accepted steps of every stage, in march order, as they are solved. gas and
+        # water advance in place (after the generator is exhausted they hold the
+        # boiler outlet); nothing is kept per step, so memory does not grow with tube
+        # length. Stop early by breaking out of the loop. No warm start is used or stored.
+        for i, (stage, geom) in enumerate(zip(self.stages, self.compiled)):
+            gas.stage = stage
+            water.stage = stage
+            solver = StageSolver(stage=stage, gas=gas, water=water, geom=geom)
+            yield from solver.march(stage=f"HX_{i + 1}", keep_steps=False)
@@ -0,0 +1,161 @@
+from __future__ import annotations
+import hashlib
+import json
+from dataclasses import dataclass
+from itertools import combinations_with_replacement
+from pathlib import Path
+from typing import Dict, List, Tuple
+import numpy as np
+from common.units import Q_
+from heat_transfer.functions.continuation import OperatingPoint
+from heat_transfer.functions.scenarios import Scenario, ScenarioRunner
+
+INPUTS = ("gas_mass_flow_rate", "gas_temperature", "water_mass_flow_rate", "drum_pressure")
+OUTPUTS = ("gas_temperature_out", "gas_pressure_drop", "water_enthalpy_out")   # K, Pa, J/kg
+
+def config_hash(stages_path: str | Path, streams_path: str | Path) -> str:
+    h = hashlib.sha256()
+    for p in (stages_path, streams_path):
+        h.update(Path(p).read_bytes())
+    return h.hexdigest()
+
+@dataclass(frozen=True)
+class Envelope:
+    lower: Tuple[float, float, float, float]    # SI, in INPUTS order
+    upper: Tuple[float, float, float, float]
+
+    def contains(self, point: OperatingPoint) -> bool:
+        return all(lo <= v <= hi for lo, v, hi in zip(self.lower, point.as_tuple(), self.upper))
+
+    def normalize(self, X: np.ndarray) -> np.ndarray:
+        lo, hi = np.asarray(self.lower), np.asarray(self.upper)
+        return 2.0 * (X - lo) / (hi - lo) - 1.0
+
+    def latin_hypercube(self, n: int, seed: int | None = None) -> List[OperatingPoint]:
+        rng = np.random.default_rng(seed)
+        u = (rng.permuted(np.tile(np.arange(n), (len(INPUTS), 1)), axis=1).T + rng.random((n, len(INPUTS)))) / n
+        X = np.asarray(self.lower) + u * (np.asarray(self.upper) - np.asarray(self.lower))
+        return [OperatingPoint(*map(float, row)) for row in X]
+
+@dataclass(frozen=True)
+class SurrogatePrediction:
+    gas_temperature_out: Q_
+    gas_pressure_drop: Q_
+    water_enthalpy_out: Q_
+    source: str     # "surrogate" or "solver"
+
+def _scenario(point: OperatingPoint, name: str) -> Scenario:
+    return Scenario(
+        name=name,
+        gas_mass_flow_rate=Q_(point.gas_mass_flow_rate, "kg/s"),
+        gas_temperature=Q_(point.gas_temperature, "K"),
+        water_mass_flow_rate=Q_(point.water_mass_flow_rate, "kg/s"),
+        drum_pressure=Q_(point.drum_pressure, "Pa"),
+    )
+
+def _quadratic_features(Z: np.ndarray) -> np.ndarray:
+    cols = [np.ones(len(Z))] + [Z[:, i] for i in range(Z.shape[1])]
+    cols += [Z[:, i] * Z[:, j] for i, j in combinations_with_replacement(range(Z.shape[1]), 2)]
+    return np.column_stack(cols)
+
+def _min_samples(method: str) -> int:
+    # poly: one per quadratic coefficient; rbf: one per term of its degree-1 polynomial tail
+    if method == "poly":
+        return _quadratic_features(np.zeros((1, len(INPUTS)))).shape[1]
+    return len(INPUTS) + 1
+
+class BoilerSurrogate:
+    def __init__(self, envelope: Envelope, X: np.ndarray, Y: np.ndarray, config_hash: str, method: str = "poly"):
+        if method not in ("poly", "rbf"):
+            raise ValueError(f"Unknown surrogate method: {method}")
+        self.envelope = envelope
+        self.X = X                  # training inputs, SI, INPUTS order
+        self.Y = Y                  # training outputs, SI, OUTPUTS order
+        self.config_hash = config_hash
+        self.method = method
+        self._runner: ScenarioRunner | None = None  # in-process full solver for out-of-envelope queries
+        self._fit()
+
+    def _fit(self) -> None:
+        Z = self.envelope.normalize(self.X)
+        if self.method == "poly":
+            self._coef = np.linalg.lstsq(_quadratic_features(Z), self.Y, rcond=None)[0]
+        else:
+            from scipy.interpolate import RBFInterpolator     # scipy is loaded only for rbf models
+            self._rbf = RBFInterpolator(Z, self.Y, kernel="thin_plate_spline", degree=1)
+
+    def _eval(self, X: np.ndarray) -> np.ndarray:
+        Z = self.envelope.normalize(np.atleast_2d(X))
+        if self.method == "poly":
+            return _quadratic_features(Z) @ self._coef
+        return self._rbf(Z)
+
+    ######################### Training #########################
+    @classmethod
+    def train(cls, stages_path: str | Path, streams_path: str | Path, envelope: Envelope, n_samples: int = 64,
+              method: str = "poly", seed: int | None = 0, processes: int | None = None) -> "BoilerSurrogate":
+        runner = ScenarioRunner(stages_path, streams_path, processes=processes)
+        points = envelope.latin_hypercube(n_samples, seed=seed)
+        scenarios = [_scenario(p, name=str(i)) for i, p in enumerate(points)]
+        p_in = runner.gas.pressure
+        X, Y = [], []
+        for r in runner.run(scenarios):
+            if not r.ok:
+                continue    # failed samples are left out of the fit
+            X.append(points[int(r.scenario.name)].as_tuple())
+            Y.append((r.gas_temperature_out.to("K").magnitude,
+                      (p_in - r.gas_pressure_out).to("Pa").magnitude,
+                      r.water_enthalpy_out.to("J/kg").magnitude))
+        if len(X) < _min_samples(method):
+            raise RuntimeError(f"Only {len(X)} of {n_samples} samples solved; too few to fit a surrogate")
+        model = cls(envelope, np.asarray(X, dtype=float), np.asarray(Y, dtype=float),
+                    config_hash(stages_path, streams_path), method=method)
+        model.attach_solver(stages_path, streams_path)
+        return model
+
+    ######################### Persistence #########################
+    def save(self, path: str | Path) -> None:
+        meta = {"method": self.method, "config_hash": self.config_hash, "inputs": INPUTS, "outputs": OUTPUTS,
+                "lower": self.envelope.lower, "upper": self.envelope.upper}
+        with Path(path).open("wb") as fh:
+            np.savez(fh, X=self.X, Y=self.Y, meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path: str | Path, stages_path: str | Path, streams_path: str | Path) -> "BoilerSurrogate":
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            X, Y = data["X"], data["Y"]
+        current = config_hash(stages_path, streams_path)
+        if meta["config_hash"] != current:
+            raise ValueError(f"Surrogate {path} was trained on a different stages/streams configuration")
+        envelope = Envelope(tuple(meta["lower"]), tuple(meta["upper"]))
+        model = cls(envelope, X, Y, current, method=meta["method"])
+        model.attach_solver(stages_path, streams_path)
+        return model
+
+    ######################### Query #########################
+    def attach_solver(self, stages_path: str | Path, streams_path: str | Path) -> None:
+        if config_hash(stages_path, streams_path) != self.config_hash:
+            raise ValueError("Fallback solver configuration differs from the one the surrogate was trained on")
+        self._runner = ScenarioRunner(stages_path, streams_path, processes=0)
+
+    def predict(self, point: OperatingPoint) -> SurrogatePrediction:
+        if self.envelope.contains(point):
+            T, dp, h = self._eval(np.asarray(point.as_tuple()))[0]
+            return SurrogatePrediction(Q_(T, "K"), Q_(dp, "Pa"), Q_(h, "J/kg"), source="surrogate")
+        if self._runner is None:
+            raise ValueError(f"{point} is outside the surrogate envelope and no solver is attached")
+        r = next(self._runner.run([_scenario(point, name="fallback")]))
+        if not r.ok:
+            raise RuntimeError(f"Fallback solve failed: {r.error}")
+        return SurrogatePrediction(r.gas_temperature_out, (self._runner.gas.pressure - r.gas_pressure_out).to("Pa"),
+                                   r.water_enthalpy_out, source="solver")
+
+    def predict_many(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        # vectorized in-envelope evaluation; rows outside the envelope come back as NaN
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        inside = np.all((X >= np.asarray(self.envelope.lower)) & (X <= np.asarray(self.envelope.upper)), axis=1)
+        Y = np.full((len(X), len(OUTPUTS)), np.nan)
+        if inside.any():
+            Y[inside] = self._eval(X[inside])
+        return {name: Y[:, i] for i, name in enumerate(OUTPUTS)}
@@ -0,0 +1,135 @@
+from __future__ import annotations
+import copy
+import csv
+from dataclasses import dataclass, replace
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, Iterable, Iterator
+from common.units import Q_
+from heat_transfer.config.models import Stages, GasStream, WaterStream
+from heat_transfer.functions.continuation import SolutionStore
+from heat_transfer.functions.coupling import CombustionBoilerPipeline, case_from_settings
+from thermo.config.schemas import Settings
+
+######################### Historian input #########################
+@dataclass(frozen=True)
+class PlantSample:
+    timestamp: str
+    fuel_mass_flow: Q_ | None = None        # None keeps the settings value
+    air_T: Q_ | None = None
+    feedwater_mass_flow: Q_ | None = None   # None keeps the streams.yaml value
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "PlantSample":
+        def col(name: str, unit: str) -> Q_ | None:
+            v = row.get(name)
+            if v is None or str(v).strip() == "":
+                return None
+            return Q_(float(v), unit)
+        return cls(
+            timestamp=str(row["timestamp"]),
+            fuel_mass_flow=col("fuel_mass_flow_kg_s", "kg/s"),
+            air_T=col("air_T_C", "degC"),
+            feedwater_mass_flow=col("feedwater_mass_flow_kg_s", "kg/s"),
+        )
+
+def read_historian(path: str | Path, batch_size: int = 1024) -> Iterator[PlantSample]:
+    # rows are read lazily; Parquet goes through pyarrow in record batches
+    path = Path(path)
+    if path.suffix.lower() in (".parquet", ".pq"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Reading Parquet historian files requires pyarrow") from exc
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            for row in batch.to_pylist():
+                yield PlantSample.from_row(row)
+        return
+    with path.open("r", encoding="utf-8", newline="") as fh:
+        for row in csv.DictReader(fh):
+            yield PlantSample.from_row(row)
+
+######################### Replay #########################
+@dataclass(frozen=True)
+class Deadbands:
+    fuel_mass_flow: Q_ = Q_(1e-3, "kg/s")
+    air_T: Q_ = Q_(0.5, "K")
+    feedwater_mass_flow: Q_ = Q_(1e-2, "kg/s")
+
+    def within(self, a: PlantSample, b: PlantSample) -> bool:
+        for name in ("fuel_mass_flow", "air_T", "feedwater_mass_flow"):
+            va, vb = getattr(a, name), getattr(b, name)
+            if (va is None) != (vb is None):
+                return False
+            if va is not None and abs(vb.to_base_units() - va.to_base_units()) > getattr(self, name).to_base_units():
+                return False
+        return True
+
+@dataclass(frozen=True)
+class TimeSeriesPoint:
+    timestamp: str
+    T_ad: Q_
+    gas_temperature_out: Q_
+    gas_pressure_out: Q_
+    water_enthalpy_out: Q_
+    resolved: bool          # False when the inputs stayed inside the deadbands
+
+@dataclass
+class ReplayStats:
+    timesteps: int = 0
+    solves: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def skipped(self) -> int:
+        return self.timesteps - self.solves
+
+    @property
+    def timesteps_per_second(self) -> float:
+        return self.timesteps / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.timesteps} timesteps ({self.solves} solved, {self.skipped} within deadbands) "
+                f"in {self.elapsed_s:,.2f} s -> {self.timesteps_per_second:,.3f} timesteps/s")
+
+class QuasiSteadyReplay:
+    def __init__(self, settings: Settings, stages: Stages, gas: GasStream, water: WaterStream,
+                 deadbands: Deadbands = Deadbands(), warm_start: bool = True):
+        self.s = settings
+        self.water = water          # template: feedwater state
+        self.deadbands = deadbands
+        # only the previous timestep is kept, so memory stays flat over long replays
+        store = SolutionStore(max_size=1) if warm_start else None
+        self.pipeline = CombustionBoilerPipeline(settings, stages, gas, water, store=store)
+        self.stats = ReplayStats()
+
+    def _solve(self, sample: PlantSample) -> TimeSeriesPoint:
+        case = case_from_settings(self.s, fuel_mass_flow=sample.fuel_mass_flow, air_T=sample.air_T)
+        water = self.water
+        if sample.feedwater_mass_flow is not None:
+            water = copy.deepcopy(self.water)
+            water.mass_flow_rate = sample.feedwater_mass_flow
+        out = self.pipeline.run(case, water=water)
+        return TimeSeriesPoint(
+            timestamp=sample.timestamp,
+            T_ad=out.combustion.T_ad_K,
+            gas_temperature_out=out.gas_out.temperature,
+            gas_pressure_out=out.gas_out.pressure,
+            water_enthalpy_out=out.water_out.enthalpy,
+            resolved=True,
+        )
+
+    def run(self, samples: Iterable[PlantSample]) -> Iterator[TimeSeriesPoint]:
+        solved_on: PlantSample | None = None    # inputs of the last actual solve
+        last: TimeSeriesPoint | None = None
+        for sample in samples:
+            t0 = perf_counter()
+            if last is not None and self.deadbands.within(solved_on, sample):
+                last = replace(last, timestamp=sample.timestamp, resolved=False)
+            else:
+                last = self._solve(sample)
+                solved_on = sample
+                self.stats.solves += 1
+            self.stats.timesteps += 1
+            self.stats.elapsed_s += perf_counter() - t0
+            yield last
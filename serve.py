@@ -0,0 +1,28 @@
+import argparse
+import asyncio
+from heat_transfer.functions.service import SolverService
+
+# python serve.py [--port 8765 | --unix /tmp/boiler.sock] [--processes N]
+#   curl -s localhost:8765/combustion -d '{"fuel_mass_flow_kg_s": 0.45}'
+#   curl -s localhost:8765/metrics
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="serve on a Unix socket instead of TCP")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--batch-window", type=float, default=0.005, help="seconds")
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--warm-start", action="store_true",
+                        help="seed boiler solves from earlier ones (faster; results depend on request history)")
+    args = parser.parse_args()
+
+    service = SolverService("thermo/config/settings.toml", "heat_transfer/config/stages.yaml",
+                            "heat_transfer/config/streams.yaml", processes=args.processes,
+                            batch_window=args.batch_window, max_batch=args.max_batch,
+                            warm_start=args.warm_start)
+    try:
+        asyncio.run(service.serve(host=args.host, port=args.port, unix_socket=args.unix))
+    except KeyboardInterrupt:
+        pass
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 from typing import Dict
 import tomllib, pathlib
 from common.units import ureg, Q_
+from common.config_cache import load_cached
 
 
 @dataclass(frozen=True)
@@ -23,7 +24,10 @@ class Settings:
     excess_air_ratio: float
 
 def load_settings(path: str) -> Settings:
-    s = tomllib.loads(pathlib.Path(path).read_text())
+    return load_cached("settings", path, _build_settings, ("thermo.config.schemas",), frozen=True)
+
+def _build_settings(data: bytes) -> Settings:
+    s = tomllib.loads(data.decode("utf-8"))
     return Settings(
         species_molar_masses={k: Q_(v, "kg/mol") for k, v in s["species"]["molar_masses"].items()},
         species_cp_fluids_map=s["species"]["cp_fluids_map"],
@@ -1,5 +1,3 @@
-import CoolProp.CoolProp as CP
-
 class CoolPropThermoProvider:
     def __init__(self, fluid_map: dict):
         self._map = fluid_map
@@ -0,0 +1,18 @@
+from __future__ import annotations
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import CoolProp.CoolProp as CP
+
+# CoolProp takes seconds to import; it is loaded on first use, not at import.
+@lru_cache(maxsize=None)
+def coolprop():
+    import CoolProp.CoolProp as CP
+    return CP
+
+# Building an AbstractState costs far more than updating one, so each
+# (backend, fluid) pair is built once per process and reused by every caller.
+@lru_cache(maxsize=None)
+def abstract_state(backend: str, fluid: str) -> CP.AbstractState:
+    return coolprop().AbstractState(backend, fluid)
@@ -1,5 +1,4 @@
-from scipy.optimize import root_scalar
-
 def solve_brentq(func, bracket, args, xtol):
+    from scipy.optimize import root_scalar
     sol = root_scalar(func, bracket=bracket, method="brentq", xtol=xtol, args=args)
     return sol.root
@@ -1,6 +1,9 @@
 from dataclasses import dataclass
 from thermo.core.streams import GasStream
 
+# scalar case inputs the uncertainty and sensitivity services perturb by name
+PARAMETERS = ("excess_air_ratio", "air_T", "fuel_T", "fuel_mass_flow", "air_humidity")
+
 @dataclass(frozen=True)
 class CombustionCase:
     air: GasStream
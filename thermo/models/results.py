@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from typing import Dict, Optional, Any
-from common.units import Q_
+from common.units import Q_, unit as _unit
 
 @dataclass(frozen=True)
 class Results:
@@ -108,7 +108,7 @@ class Results:
 
     def _fmt(self, q: Q_, unit: str, dec: int) -> str:
         try:
-            mag = q.to(unit).m
+            mag = q.to(_unit(unit)).m
         except Exception:
             # already plain number in target unit
             mag = self._mag(q)
@@ -123,6 +123,36 @@ class Results:
             rows.append(f"  {k:>4}: {pct:8.{percent_dec}f} %")
         return rows
 
+    # ---- columnar form: SI floats, compositions flattened per species ----
+    _RECORD_SCALARS = (
+        # (column, field, SI unit)
+        ("power_LHV_W", "power_LHV_kW", "W"),
+        ("fuel_sensible_W", "fuel_sensible_kW", "W"),
+        ("air_sensible_W", "air_sensible_kW", "W"),
+        ("Q_in_total_W", "Q_in_total_kW", "W"),
+        ("air_molar_flow_mol_s", "air_molar_flow_mol_s", "mol/s"),
+        ("air_mass_flow_kg_s", "air_mass_flow_kg_s", "kg/s"),
+        ("flue_molar_flow_mol_s", "flue_n_dot", "mol/s"),
+        ("flue_mass_flow_kg_s", "flue_mass_flow_kg_s", "kg/s"),
+        ("T_ad_K", "T_ad_K", "K"),
+        ("air_cp_J_kgK", "air_cp_mass", "J/(kg*K)"),
+        ("fuel_cp_J_kgK", "fuel_cp_mass", "J/(kg*K)"),
+    )
+    _RECORD_COMPOSITIONS = ("flue_x", "flue_w", "fuel_x", "air_x")
+
+    def to_record(self) -> Dict[str, float]:
+        nan = float("nan")
+        rec: Dict[str, float] = {}
+        for column, name, unit in self._RECORD_SCALARS:
+            q = getattr(self, name)
+            rec[column] = nan if q is None else float(q.to(_unit(unit)).m)
+        rec["excess_air_ratio"] = nan if self.excess_air_ratio is None else float(self.excess_air_ratio)
+        rec["O2_req_per_mol_fuel"] = nan if self.O2_req_per_mol_fuel is None else float(self.O2_req_per_mol_fuel)
+        for name in self._RECORD_COMPOSITIONS:
+            for species, v in getattr(self, name).items():
+                rec[f"{name}_{species}"] = float(self._mag(v))
+        return rec
+
     # Machine-readable form if needed elsewhere
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -0,0 +1,106 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+import numpy as np
+from thermo.models.results import Results
+
+# Many combustion Results as typed float columns in fixed SI units (see
+# Results.to_record), held in one growable NumPy structured array. to_numpy()
+# is a view of that buffer; Arrow / Parquet export needs pyarrow.
+
+CASE_WIDTH = 64     # characters kept of each case label
+
+class ResultsTable:
+    def __init__(self, columns: Sequence[str] = (), capacity: int = 64):
+        self._columns: List[str] = list(columns)
+        self._buf = np.empty(max(1, capacity), dtype=self._dtype(self._columns))
+        self._n = 0
+
+    @staticmethod
+    def _dtype(columns: Sequence[str]) -> np.dtype:
+        return np.dtype([("case", f"U{CASE_WIDTH}")] + [(c, "f8") for c in columns])
+
+    @classmethod
+    def from_results(cls, results: Iterable[Results], cases: Iterable[str] | None = None) -> "ResultsTable":
+        table = cls()
+        table.extend(results, cases)
+        return table
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def _reserve(self, n: int, columns: Sequence[str]) -> None:
+        # grow geometrically; a new species column re-lays the buffer once
+        new = [c for c in columns if c not in self._buf.dtype.names]
+        if not new and n <= len(self._buf):
+            return
+        self._columns += new
+        buf = np.empty(max(n, 2 * len(self._buf)) if n > len(self._buf) else len(self._buf),
+                       dtype=self._dtype(self._columns))
+        for name in self._buf.dtype.names:
+            buf[name][: self._n] = self._buf[name][: self._n]
+        for name in new:
+            buf[name][: self._n] = np.nan
+        self._buf = buf
+
+    def append(self, result: Results, case: str = "") -> None:
+        self.append_record(result.to_record(), case)
+
+    def append_record(self, record: Dict[str, float], case: str = "") -> None:
+        self._reserve(self._n + 1, list(record))
+        row = self._buf[self._n]
+        row["case"] = case
+        for name in self._columns:
+            row[name] = record.get(name, np.nan)
+        self._n += 1
+
+    def extend(self, results: Iterable[Results], cases: Iterable[str] | None = None) -> None:
+        cases = iter(cases) if cases is not None else None
+        for res in results:
+            self.append(res, next(cases) if cases is not None else str(self._n))
+
+    def column(self, name: str) -> np.ndarray:
+        return self._buf[name][: self._n]
+
+    def to_numpy(self) -> np.ndarray:
+        # view, not a copy: later appends that grow the buffer do not show up in it
+        return self._buf[: self._n]
+
+    ######################### Arrow / Parquet #########################
+    def to_arrow(self):
+        try:
+            import pyarrow as pa
+        except ImportError as exc:
+            raise ImportError("Arrow export of a ResultsTable requires pyarrow") from exc
+        return pa.table({name: np.ascontiguousarray(self.column(name)) for name in ("case", *self._columns)})
+
+    def to_parquet(self, path: str | Path) -> None:
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow(), str(path))
+
+    @classmethod
+    def read_parquet(cls, path: str | Path) -> "ResultsTable":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Reading Parquet results requires pyarrow") from exc
+        data = pq.read_table(str(path)).to_pydict()
+        table = cls([c for c in data if c != "case"], capacity=len(data.get("case", ())) or 1)
+        for i, case in enumerate(data.get("case", ())):
+            table.append_record({c: data[c][i] for c in table._columns}, case)
+        return table
+
+    def save_npy(self, path: str | Path) -> None:
+        np.save(path, self.to_numpy())
+
+    @classmethod
+    def load_npy(cls, path: str | Path) -> "ResultsTable":
+        arr = np.load(path)
+        table = cls([c for c in arr.dtype.names if c != "case"], capacity=len(arr))
+        table._buf[: len(arr)] = arr
+        table._n = len(arr)
+        return table
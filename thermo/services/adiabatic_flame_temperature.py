@@ -1,4 +1,5 @@
 from common.units import ureg, Q_
+from common.tracing import TRACER, span
 from thermo.core.heat_capacity import MixtureCp
 
 class AdiabaticFlameTemperature:
@@ -21,5 +22,18 @@ class AdiabaticFlameTemperature:
               Q_in: Q_, T_ref_K: Q_) -> Q_:
         f = lambda T: self._residual(T * ureg.kelvin, P_Pa, flue_mass_fracs, 
                                      flue_mass_flow, Q_in, T_ref_K).to(ureg.watt).m
-        T_val = self._solver(f, (1700, 3000), (), 1e-6)
+        with span("AdiabaticFlameTemperature.solve", cat="root") as sp:
+            if TRACER.enabled:
+                f = _traced(f, sp)
+            T_val = self._solver(f, (1700, 3000), (), 1e-6)
+            sp.set(T_ad=T_val)
         return T_val * ureg.kelvin
+
+def _traced(f, sp: span):
+    # records every residual evaluation of the root solver
+    def g(T):
+        r = f(T)
+        sp.args["evaluations"] = sp.args.get("evaluations", 0) + 1
+        TRACER.instant("residual", "root", T=T, residual_W=r)
+        return r
+    return g
@@ -1,12 +1,50 @@
 from thermo.core.composition import Composition, mix_molar_mass
 from thermo.core.streams import GasStream
+from thermo.core.coolprop_provider import CoolPropThermoProvider
+from thermo.core.heat_capacity import MixtureCp
+from thermo.core.heats import compute_LHV_HHV
+from thermo.core.stoch import stoich_O2_required_per_mol_fuel, air_flow_rates
+from thermo.core.flue import from_fuel_and_air
+from thermo.core.balances import sensible_heat, total_input_heat
+from thermo.core.root_solvers import solve_brentq
+from thermo.services.adiabatic_flame_temperature import AdiabaticFlameTemperature
+from common.instrumentation import scope, report
+from common import tracing
+from common.result_cache import ResultCache, default_cache
 
 class Combustor:
-    def __init__(self, settings, thermo, cp, hv, st, flue, balances, solver, aft):
+    def __init__(self, settings, thermo, cp, hv, st, flue, balances, solver, aft, cache: ResultCache | None = None):
         self.s=settings; self.th=thermo; self.cp=cp; self.hv=hv; self.st=st; self.flue=flue
         self.bal=balances; self.solver=solver; self.aft=aft
+        self.cache = cache if cache is not None else default_cache()     # opt-in, BOILER_RESULT_CACHE
 
     def run(self, case):
+        if self.cache is not None:
+            # keyed by the case, the settings, the wired solver functions and the thermo sources
+            key = self.cache.key("combustion", case, self.s, self.th._map, (self.hv, self.st, self.flue,
+                                 self.bal, self.solver), code=("thermo",))
+            res = self.cache.get(key)
+            if res is not None:
+                return res
+        with scope(stage="combustor"):
+            res = self._run(case)
+        report("Combustor.run")
+        tracing.flush()
+        if self.cache is not None:
+            self.cache.put(key, res)
+        return res
+
+    def _run(self, case):
+        b = self.balance(case)
+        with scope(phase="flame_temperature"):
+            T_ad = self.aft.solve(case.air.P, b["flue_w"], b["flue_m"], b["Q_in"], case.T_ref)
+
+        from thermo.models.results import Results
+        return Results(b["power"], b["fuel_sens"], b["air_sens"], b["Q_in"], b["air_n"], b["air_m"],
+                       b["flue_x"], b["flue_n"], b["flue_m"], T_ad)
+
+    def balance(self, case) -> dict:
+        # everything up to the flame temperature: closed-form, no root solve
         M = self.s.species_molar_masses
         air = case.air
         fuel = case.fuel
@@ -27,8 +65,9 @@ class Combustor:
         flue_x, flue_n = self.flue(fuel_n, air_n, fuel_x, air_x, O2_req)
 
         # cp at inlets
-        air_cp = self.cp.cp_mass_mixture(air.T, air.P, air.as_mass_fraction(M))
-        fuel_cp = self.cp.cp_mass_mixture(fuel.T, fuel.P, fuel.as_mass_fraction(M))
+        with scope(phase="inlet_cp"):
+            air_cp = self.cp.cp_mass_mixture(air.T, air.P, air.as_mass_fraction(M))
+            fuel_cp = self.cp.cp_mass_mixture(fuel.T, fuel.P, fuel.as_mass_fraction(M))
 
         fuel_sens = self.bal[0](fuel.mass_flow(M), fuel_cp, fuel.T, case.T_ref)
         air_sens  = self.bal[0](air_m,     air_cp,  air.T,  case.T_ref)
@@ -36,8 +75,19 @@ class Combustor:
 
         flue_w = Composition(flue_x, "mole").to_mass(M).fractions
         flue_m = flue_n * mix_molar_mass(flue_x, M)
+        return {"power": power_LHV_kW, "fuel_sens": fuel_sens, "air_sens": air_sens, "Q_in": Q_in,
+                "air_n": air_n, "air_m": air_m, "flue_x": flue_x, "flue_n": flue_n, "flue_w": flue_w, "flue_m": flue_m}
 
-        T_ad = self.aft.solve(air.P, flue_w, flue_m, Q_in, case.T_ref)
 
-        from thermo.models.results import Results
-        return Results(power_LHV_kW, fuel_sens, air_sens, Q_in, air_n, air_m, flue_x, flue_n, flue_m, T_ad)
+def build_combustor(settings) -> Combustor:
+    # the one Combustor wiring; thermo_run.py, the pipeline, the service and the benchmarks use it
+    thermo = CoolPropThermoProvider(settings.species_cp_fluids_map)
+    cp = MixtureCp(thermo)
+    aft = AdiabaticFlameTemperature(cp, solve_brentq)
+    return Combustor(settings, thermo, cp,
+                     compute_LHV_HHV,
+                     (stoich_O2_required_per_mol_fuel, air_flow_rates),
+                     from_fuel_and_air,
+                     (sensible_heat, total_input_heat),
+                     solve_brentq,
+                     aft)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+from dataclasses import replace
+from typing import Dict, Sequence
+from common.units import Q_
+from common.sensitivity import Sensitivities
+from thermo.core.composition import Composition
+from thermo.models.combustion_case import CombustionCase, PARAMETERS
+
+# Derivatives of the adiabatic flame temperature with respect to the case inputs,
+# by the implicit-function theorem on the energy balance
+#     r(T, p) = Q_in(p) - m_flue(p) * sum_i w_i(p) * (h_i(T) - h_i(T_ref)) = 0
+#     dT_ad/dp = -(dr/dp) / (dr/dT),   dr/dT = -m_flue * cp_mix(T_ad)
+# at the T_ad of one primal Combustor.run. dr/dp needs only the closed-form part of
+# the chain (Combustor.balance), differenced centrally per parameter with T_ad held
+# fixed, so no perturbation repeats the flame-temperature root solve. Parameter
+# names follow combustion_case.PARAMETERS, plus "fuel:<species>" mass-fraction
+# multipliers.
+
+def parameter_value(case: CombustionCase, M: Dict[str, Q_], name: str) -> float:
+    # K, kg/s, mol/mol; 1.0 for fuel multipliers
+    if name == "excess_air_ratio":
+        return float(case.excess_air_ratio)
+    if name == "air_T":
+        return case.air.T.to("K").magnitude
+    if name == "fuel_T":
+        return case.fuel.T.to("K").magnitude
+    if name == "fuel_mass_flow":
+        return case.fuel.mass_flow(M).to("kg/s").magnitude
+    if name == "air_humidity":
+        return float(Q_(case.air.as_mole_fraction(M).get("H2O", 0.0)).to("").magnitude)
+    if name.startswith("fuel:"):
+        return 1.0
+    raise ValueError(f"Unknown parameter '{name}' (known: {', '.join(PARAMETERS)}, fuel:<species>)")
+
+def perturbed_case(case: CombustionCase, M: Dict[str, Q_], name: str, value: float) -> CombustionCase:
+    # the case with one parameter set to value, same conventions as VectorCombustor.inputs
+    air, fuel = case.air, case.fuel
+    if name == "excess_air_ratio":
+        return replace(case, excess_air_ratio=value)
+    if name == "air_T":
+        return replace(case, air=replace(air, T=Q_(value, "K")))
+    if name == "fuel_T":
+        return replace(case, fuel=replace(fuel, T=Q_(value, "K")))
+    if name == "fuel_mass_flow":
+        return replace(case, fuel=replace(fuel, flow_mass=Q_(value, "kg/s"), flow_mol=None))
+    if name == "air_humidity":
+        x = air.as_mole_fraction(M)
+        dry = 1.0 - x.get("H2O", 0.0)
+        x = {sp: v * (1.0 - value) / dry for sp, v in x.items() if sp != "H2O"}
+        x["H2O"] = value
+        return replace(case, air=replace(air, composition=Composition(x, "mole")))
+    if name.startswith("fuel:"):
+        w = dict(fuel.as_mass_fraction(M))
+        flow = fuel.mass_flow(M)
+        w[name[5:]] = w[name[5:]] * value
+        total = sum(w.values())
+        w = {sp: v / total for sp, v in w.items()}
+        return replace(case, fuel=replace(fuel, composition=Composition(w, "mass"), flow_mass=flow, flow_mol=None))
+    raise ValueError(f"Unknown parameter '{name}' (known: {', '.join(PARAMETERS)}, fuel:<species>)")
+
+def default_parameters(case: CombustionCase, M: Dict[str, Q_]) -> list:
+    return list(PARAMETERS) + [f"fuel:{sp}" for sp in case.fuel.as_mass_fraction(M)]
+
+def flame_temperature(combustor, case: CombustionCase, params: Sequence[str] | None = None, result=None,
+                      rel_step: float = 1e-6) -> Sensitivities:
+    # result: a Combustor.run(case) already at hand, else it is run here
+    M = combustor.s.species_molar_masses
+    params = list(params) if params is not None else default_parameters(case, M)
+    result = result if result is not None else combustor.run(case)
+    T_ad, T_ref, P = result.T_ad_K.to("K"), case.T_ref, case.air.P
+
+    b = combustor.balance(case)
+    # flue enthalpy is linear in the mass fractions: one integral per species
+    dh = {sp: combustor.cp.integrate_cp_mass(P, {sp: 1.0}, T_ref, T_ad).to("J/kg").magnitude for sp in b["flue_w"]}
+    cp_ad = combustor.cp.cp_mass_mixture(T_ad, P, b["flue_w"]).to("J/(kg*K)").magnitude
+
+    def outputs(b) -> Dict[str, float]:
+        m = b["flue_m"].to("kg/s").magnitude
+        Q_in = b["Q_in"].to("W").magnitude
+        h = sum(float(Q_(w).to("").magnitude) * dh[sp] for sp, w in b["flue_w"].items())
+        return {"residual": Q_in - m * h, "Q_in_total_W": Q_in, "power_LHV_W": b["power"].to("W").magnitude,
+                "air_mass_flow_kg_s": b["air_m"].to("kg/s").magnitude, "flue_mass_flow_kg_s": m}
+
+    base = outputs(b)
+    drdT = -base["flue_mass_flow_kg_s"] * cp_ad
+    point = {p: parameter_value(case, M, p) for p in params}
+    names = ["T_ad_K"] + [k for k in base if k != "residual"]
+    jac: Dict[str, Dict[str, float]] = {k: {} for k in names}
+    for p, v in point.items():
+        step = rel_step * max(abs(v), 1e-3)
+        up = outputs(combustor.balance(perturbed_case(case, M, p, v + step)))
+        down = outputs(combustor.balance(perturbed_case(case, M, p, v - step)))
+        d = {k: (up[k] - down[k]) / (2.0 * step) for k in base}
+        jac["T_ad_K"][p] = -d["residual"] / drdT
+        for k in names[1:]:
+            jac[k][p] = d[k]
+
+    out = {"T_ad_K": T_ad.magnitude, **{k: base[k] for k in names[1:]}}
+    return Sensitivities(point=point, outputs=out, jacobian=jac)
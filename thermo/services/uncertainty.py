@@ -0,0 +1,265 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from common.units import Q_
+from thermo.core.composition import Composition, mix_molar_mass
+from thermo.models.combustion_case import CombustionCase, PARAMETERS
+
+# Monte Carlo / Latin-hypercube propagation of input uncertainty through the
+# combustion chain. Samples are evaluated in batches: the Combustor's own LHV,
+# stoichiometry, flue and balance functions run on NumPy arrays, and cp and the
+# adiabatic flame temperature use per-species cp tables built once from the
+# Combustor's MixtureCp (so CoolProp is called per grid point, not per sample).
+# Statistics are updated after every batch; sampling stops when the tracked means
+# and percentiles have converged or n_max is reached. Output columns follow
+# Results.to_record.
+
+######################### Distributions #########################
+@dataclass(frozen=True)
+class Normal:
+    mean: float
+    std: float
+
+    def ppf(self, u: np.ndarray) -> np.ndarray:
+        from scipy.special import ndtri
+        return self.mean + self.std * ndtri(u)
+
+@dataclass(frozen=True)
+class Uniform:
+    low: float
+    high: float
+
+    def ppf(self, u: np.ndarray) -> np.ndarray:
+        return self.low + (self.high - self.low) * u
+
+@dataclass(frozen=True)
+class Triangular:
+    low: float
+    mode: float
+    high: float
+
+    def ppf(self, u: np.ndarray) -> np.ndarray:
+        a, c, b = self.low, self.mode, self.high
+        f = (c - a) / (b - a)
+        return np.where(u < f, a + np.sqrt(u * (b - a) * (c - a)), b - np.sqrt((1 - u) * (b - a) * (b - c)))
+
+@dataclass(frozen=True)
+class Uncertain:
+    # name: one of PARAMETERS, or "fuel:<species>" for a multiplier on that fuel mass
+    # fraction (the composition is renormalised). Values in K, kg/s, mol/mol.
+    name: str
+    dist: Normal | Uniform | Triangular
+
+def unit_samples(rng: np.random.Generator, n: int, d: int, method: str = "lhs") -> np.ndarray:
+    # (n, d) in (0, 1); "lhs" stratifies each batch on its own
+    if method == "mc":
+        return rng.random((n, d))
+    if method != "lhs":
+        raise ValueError(f"Unknown sampling method '{method}' (known: mc, lhs)")
+    u = (np.arange(n)[:, None] + rng.random((n, d))) / n
+    for j in range(d):
+        u[:, j] = u[rng.permutation(n), j]
+    return u
+
+######################### cp tables #########################
+class CpTable:
+    # cp_i(T) [J/(kg K)] of each species on a grid at one pressure, and its exact
+    # integral for piecewise-linear cp. The grid is split at the water saturation
+    # temperature so the liquid/vapour jump in cp is not smeared over a cell.
+    def __init__(self, cp, species: Sequence[str], P: Q_, T_lo: float, T_hi: float, dT: float = 2.0):
+        from thermo.core.cp_cache import coolprop
+        self.species = list(species)
+        grid = np.arange(T_lo, T_hi + dT, dT)
+        if "H2O" in self.species:
+            T_sat = coolprop().PropsSI("T", "P", P.to("Pa").magnitude, "Q", 0, "Water")
+            if T_lo < T_sat < T_hi:
+                grid = np.union1d(grid[np.abs(grid - T_sat) > 0.01], [T_sat - 1e-3, T_sat + 1e-3])
+        self.T = grid
+        self.cp = np.array([[cp.cp_mass_mixture(Q_(T, "K"), P, {sp: 1.0}).to("J/(kg*K)").magnitude
+                             for sp in self.species] for T in self.T])                   # (grid, species)
+        self.slope = np.diff(self.cp, axis=0) / np.diff(self.T)[:, None]
+        steps = 0.5 * (self.cp[1:] + self.cp[:-1]) * np.diff(self.T)[:, None]
+        self.H = np.vstack([np.zeros(len(self.species)), np.cumsum(steps, axis=0)])      # J/kg from T_lo
+
+    def _locate(self, T: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        k = np.clip(np.searchsorted(self.T, T, side="right") - 1, 0, len(self.T) - 2)
+        return k, T - self.T[k]
+
+    def cp_mix(self, T: np.ndarray, w: np.ndarray) -> np.ndarray:
+        # w: (n, species) mass fractions
+        k, d = self._locate(T)
+        return np.sum(w * (self.cp[k] + self.slope[k] * d[:, None]), axis=1)
+
+    def h_mix(self, T: np.ndarray, w: np.ndarray) -> np.ndarray:
+        k, d = self._locate(T)
+        H = self.H[k] + self.cp[k] * d[:, None] + 0.5 * self.slope[k] * (d**2)[:, None]
+        return np.sum(w * H, axis=1)
+
+######################### Vectorized chain #########################
+class VectorCombustor:
+    # T_min: CoolProp has no liquid-free water state below the melting line; the
+    # tables extrapolate linearly below it
+    def __init__(self, combustor, case: CombustionCase, T_min: float = 275.0, T_max: float = 3000.0,
+                 dT: float = 2.0):
+        self.c = combustor
+        self.case = case
+        self.M = combustor.s.species_molar_masses
+        self.P = case.air.P
+        self.T_ref = case.T_ref.to("K").magnitude
+        self.T_max = T_max
+        self.species = list(self.M)
+        self.table = CpTable(combustor.cp, [sp for sp in self.species if sp in combustor.th._map], self.P,
+                             T_min, T_max, dT)
+
+    def _w(self, fractions: Dict[str, np.ndarray], n: int) -> np.ndarray:
+        # mass fractions as (n, table species)
+        return np.stack([np.broadcast_to(np.asarray(Q_(fractions.get(sp, 0.0)).to("").magnitude, dtype=float), (n,))
+                         for sp in self.table.species], axis=1)
+
+    def inputs(self, samples: Dict[str, np.ndarray], n: int):
+        # per-sample fuel mass fractions, air mole fractions, temperatures, flow and λ
+        case = self.case
+        fuel_w = {sp: np.full(n, float(v)) for sp, v in case.fuel.as_mass_fraction(self.M).items()}
+        for name, values in samples.items():
+            if name.startswith("fuel:"):
+                fuel_w[name[5:]] = fuel_w[name[5:]] * values
+        total = sum(fuel_w.values())
+        fuel_w = {sp: v / total for sp, v in fuel_w.items()}
+
+        air_x = {sp: np.full(n, float(v)) for sp, v in case.air.as_mole_fraction(self.M).items()}
+        if "air_humidity" in samples:
+            x_w = samples["air_humidity"]
+            dry = 1.0 - air_x.get("H2O", 0.0)
+            air_x = {sp: v * (1.0 - x_w) / dry for sp, v in air_x.items() if sp != "H2O"}
+            air_x["H2O"] = x_w
+
+        def get(name, default):
+            return samples[name] if name in samples else np.full(n, default)
+        return (fuel_w, air_x, get("air_T", case.air.T.to("K").magnitude), get("fuel_T", case.fuel.T.to("K").magnitude),
+                get("fuel_mass_flow", case.fuel.mass_flow(self.M).to("kg/s").magnitude),
+                get("excess_air_ratio", case.excess_air_ratio))
+
+    def evaluate(self, samples: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        c, M = self.c, self.M
+        n = len(next(iter(samples.values())))
+        fuel_w, air_x, air_T, fuel_T, m_fuel, lam = self.inputs(samples, n)
+
+        fuel_x = Composition(fuel_w, "mass").to_mole(M).fractions
+        M_fuel = mix_molar_mass(fuel_x, M)
+        M_air = mix_molar_mass(air_x, M)
+        m_fuel = Q_(m_fuel, "kg/s")
+        fuel_n = m_fuel / M_fuel
+        power = c.hv(fuel_x, M_fuel, m_fuel, c.s.formation_enthalpies, c.s.latent_heat_H2O, M["H2O"])
+        O2_req = c.st[0](fuel_x, c.s.stoich_O2_per_mol)
+        air_n, air_m = c.st[1](air_x, fuel_n, O2_req, lam, M_air)
+        flue_x, flue_n = c.flue(fuel_n, air_n, fuel_x, air_x, O2_req)
+
+        T_ref = Q_(self.T_ref, "K")
+        air_cp = Q_(self.table.cp_mix(air_T, self._w(Composition(air_x, "mole").to_mass(M).fractions, n)), "J/(kg*K)")
+        fuel_cp = Q_(self.table.cp_mix(fuel_T, self._w(fuel_w, n)), "J/(kg*K)")
+        fuel_sens = c.bal[0](m_fuel, fuel_cp, Q_(fuel_T, "K"), T_ref)
+        air_sens = c.bal[0](air_m, air_cp, Q_(air_T, "K"), T_ref)
+        Q_in = c.bal[1](fuel_sens, air_sens, power)
+
+        flue_w = self._w(Composition(flue_x, "mole").to_mass(M).fractions, n)
+        flue_m = (flue_n * mix_molar_mass(flue_x, M)).to("kg/s").magnitude
+        T_ad = self.flame_temperature(flue_w, Q_in.to("W").magnitude / flue_m)
+
+        out = {"power_LHV_W": power.to("W").magnitude, "fuel_sensible_W": fuel_sens.to("W").magnitude,
+               "air_sensible_W": air_sens.to("W").magnitude, "Q_in_total_W": Q_in.to("W").magnitude,
+               "air_mass_flow_kg_s": air_m.to("kg/s").magnitude, "flue_mass_flow_kg_s": flue_m, "T_ad_K": T_ad}
+        out.update({f"flue_x_{sp}": np.asarray(Q_(v).to("").magnitude, dtype=float) for sp, v in flue_x.items()})
+        return out
+
+    def flame_temperature(self, w: np.ndarray, dh: np.ndarray, tol: float = 1e-6) -> np.ndarray:
+        # h_mix(T) - h_mix(T_ref) = dh by Newton on the tables; NaN where T_ad > T_max
+        h_ref = self.table.h_mix(np.full(len(dh), self.T_ref), w)
+        T = np.full(len(dh), 2000.0)
+        for _ in range(50):
+            step = (self.table.h_mix(T, w) - h_ref - dh) / self.table.cp_mix(T, w)
+            T = np.clip(T - step, self.table.T[0], self.T_max)
+            if np.all(np.abs(step) < tol):
+                break
+        return np.where(self.table.h_mix(np.full(len(dh), self.T_max), w) - h_ref < dh, np.nan, T)
+
+######################### Running statistics #########################
+@dataclass
+class RunningStats:
+    # mean and variance merged batch by batch (Chan et al.); percentiles from the
+    # values seen so far, which n_max bounds
+    percentiles: Tuple[float, ...] = (5.0, 50.0, 95.0)
+    n: int = 0
+    count: Dict[str, int] = field(default_factory=dict)     # finite values per output
+    mean: Dict[str, float] = field(default_factory=dict)
+    m2: Dict[str, float] = field(default_factory=dict)
+    _values: Dict[str, List[np.ndarray]] = field(default_factory=dict)
+
+    def update(self, batch: Dict[str, np.ndarray]) -> None:
+        nb = len(next(iter(batch.values())))
+        for k, v in batch.items():
+            v = v[np.isfinite(v)]
+            mb, m2b = (float(np.mean(v)), float(np.sum((v - np.mean(v))**2))) if len(v) else (0.0, 0.0)
+            na, ma = self.count.get(k, 0), self.mean.get(k, 0.0)
+            tot = na + len(v)
+            delta = mb - ma
+            self.count[k] = tot
+            self.mean[k] = ma + delta * len(v) / tot if tot else 0.0
+            self.m2[k] = self.m2.get(k, 0.0) + m2b + delta**2 * na * len(v) / tot if tot else 0.0
+            self._values.setdefault(k, []).append(v)
+        self.n += nb
+
+    def std(self, k: str) -> float:
+        return float(np.sqrt(self.m2[k] / max(self.count[k] - 1, 1)))
+
+    def sem(self, k: str) -> float:
+        return self.std(k) / float(np.sqrt(max(self.count[k], 1)))
+
+    def quantiles(self, k: str) -> Dict[str, float]:
+        v = np.concatenate(self._values[k])
+        return {f"p{p:g}": float(x) for p, x in zip(self.percentiles, np.percentile(v, self.percentiles))}
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {k: {"mean": self.mean[k], "std": self.std(k), **self.quantiles(k)} for k in self.mean}
+
+@dataclass(frozen=True)
+class UncertaintyResult:
+    samples: int
+    batches: int
+    converged: bool
+    failed: int                             # samples with T_ad above the table range
+    stats: Dict[str, Dict[str, float]]
+    seed: int
+    method: str
+
+def propagate(combustor, case: CombustionCase, params: Sequence[Uncertain], n_max: int = 100_000,
+              batch: int = 4096, method: str = "lhs", seed: int = 0, rtol: float = 1e-3, min_samples: int = 4096,
+              track: Sequence[str] = ("T_ad_K", "power_LHV_W"),
+              percentiles: Tuple[float, ...] = (5.0, 50.0, 95.0)) -> UncertaintyResult:
+    # Stops once, for every tracked output, the standard error of the mean and the
+    # change of each percentile over the last batch are below rtol * |mean|.
+    for p in params:
+        if p.name not in PARAMETERS and not p.name.startswith("fuel:"):
+            raise ValueError(f"Unknown uncertain parameter '{p.name}' (known: {', '.join(PARAMETERS)}, fuel:<species>)")
+    rng = np.random.default_rng(seed)
+    model = VectorCombustor(combustor, case)
+    stats = RunningStats(percentiles=tuple(percentiles))
+    previous: Dict[str, Dict[str, float]] = {}
+    batches = failed = 0
+    converged = False
+    while stats.n < n_max and not converged:
+        size = min(batch, n_max - stats.n)
+        u = unit_samples(rng, size, len(params), method)
+        out = model.evaluate({p.name: p.dist.ppf(u[:, j]) for j, p in enumerate(params)})
+        failed += int(np.sum(~np.isfinite(out["T_ad_K"])))
+        stats.update(out)
+        batches += 1
+        current = {k: stats.quantiles(k) for k in track}
+        if stats.n >= min_samples and previous:
+            converged = all(
+                stats.sem(k) <= rtol * abs(stats.mean[k])
+                and all(abs(current[k][q] - previous[k][q]) <= rtol * abs(stats.mean[k]) for q in current[k])
+                for k in track)
+        previous = current
+    return UncertaintyResult(samples=stats.n, batches=batches, converged=converged, failed=failed,
+                             stats=stats.summary(), seed=seed, method=method)